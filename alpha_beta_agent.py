@@ -1,65 +1,335 @@
 import random
+import time
 from typing import Optional
 import othello
 from log_referee import LogReferee
 import evaluation
+from search import SearchAgent
+from transposition import Bound, TranspositionTable
 
 
-class AlphaBetaAgent(othello.Agent):
-    def __init__(self, play_as: othello.Player, search_depth: int =4, eval_func=evaluation.heuristic_eval_comprehensive) -> None:
-        super().__init__()
+class BudgetExhausted(Exception):
+    """Raised to abort a search whose time or node budget has run out."""
+
+
+# Static hint of every square for move ordering: corners are tried first and
+# X-squares (diagonally adjacent to a corner) last.
+_X_SQUARES = 0x0042000000004200
+SQUARE_HINTS = tuple(1 if (othello.CORNER_MASK >> ix) & 1
+                     else -1 if (_X_SQUARES >> ix) & 1 else 0
+                     for ix in range(64))
+
+
+class AlphaBetaAgent(SearchAgent):
+    # Deepest search of the anytime mode, in plies.
+    MAX_PLIES = 64
+    # Search algorithms, see __init__.
+    SEARCHES = ('alphabeta', 'pvs', 'mtdf')
+
+    def __init__(self, play_as: othello.Player, search_depth: int =4, eval_func=evaluation.heuristic_eval_comprehensive, make_unmake: bool =False, tt_size: int =1 << 16, time_budget: Optional[float] =None, node_budget: Optional[int] =None, aspiration_window: float =10., move_ordering: bool =True, search: str ='alphabeta') -> None:
+        if search not in self.SEARCHES:
+            raise ValueError(f'unknown search: {search}')
+
+        super().__init__(play_as, search_depth, eval_func, make_unmake)
+        # Transposition table keyed by hash_key, kept across moves. A tt_size
+        # of 0 disables it.
+        self.tt = TranspositionTable(tt_size) if tt_size > 0 else None
+        # Anytime mode: with a time budget (in seconds) or a node budget per
+        # move, search_depth is ignored and the search deepens one ply at a
+        # time until the budget runs out. Each iteration searches a window of
+        # aspiration_window around the score of the previous one first.
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.aspiration_window = aspiration_window
+        # Statistics of the last move: nodes searched, plies completed and
+        # score of the move chosen.
+        self.n_nodes = 0
+        self.completed_plies = 0
+        self.score = None
+        self._deadline = None
+        self._horizon = False
+        # Move ordering below the root: the move of the transposition table
+        # entry first, then the killer moves of the ply, then by history score,
+        # then by static hints. Killers are the last two moves causing a cutoff
+        # at a ply; the history score of a move is the sum of depth^2 over its
+        # cutoffs, halved before every move played.
+        self.move_ordering = move_ordering
+        # Indexed by ply, up to the deepest search of either mode.
+        self.killers = [[None, None] for _ in range(max(self.MAX_PLIES, 2 * search_depth) + 1)]
+        self.history = {player: [0] * 64 for player in othello.Player}
+        self._plies = 0
+        # Statistics since construction: cutoffs, and cutoffs by the first
+        # move searched.
+        self.n_cutoffs = 0
+        self.n_first_move_cutoffs = 0
+        # Search algorithm:
+        # - 'alphabeta': alpha-beta with the full window at every node.
+        # - 'pvs': principal variation search. Every move but the first is
+        #   searched with a null window first, and searched again with the full
+        #   window only if it may be better. Finds the same moves as alphabeta.
+        # - 'mtdf': MTD(f). The root is searched with null windows only,
+        #   converging on its score from a first guess: the static evaluation,
+        #   or the score of the previous iteration in anytime mode. It relies
+        #   on the transposition table to avoid searching again. It may choose
+        #   another move among moves of equal score.
+        # Null windows have zero width: a search with alpha = beta returns a
+        # score below, above or equal to it, which is then an upper bound, a
+        # lower bound or the value. A scout failing high onto beta (or low
+        # onto alpha) is only a bound, so it is searched again.
+        self.search = search
+        self._root_move = None
+
+    def order_moves(self, node, player: othello.Player, moves: list, tt_move: Optional[othello.Action], ply: int) -> list:
+        """Sort the (action, child) pairs of node for moves by player, most
+        promising first.
+        """
+        killers = self.killers[ply]
+        history = self.history[player]
+        adversary = player.adversary
+
+        def key(item):
+            action, child = item
+            ix = action.coords.ix
+            # The mobility of the child is cached on it, so it is free for the
+            # search of the child. An othello.SearchPosition has to play the
+            # move to find it.
+            if child is None:
+                undo = node.make(player, action)
+                try:
+                    adversary_mobility = othello.popcount(node.mobility_mask(adversary))
+                finally:
+                    node.unmake(undo)
+            else:
+                adversary_mobility = othello.popcount(child.mobility_mask(adversary))
+            return (action is tt_move, action is killers[0], action is killers[1],
+                    history[ix], SQUARE_HINTS[ix], -adversary_mobility)
+
+        return sorted(moves, key=key, reverse=True)
+
+    def record_cutoff(self, player: othello.Player, action: othello.Action, index: int, depth: int, ply: int) -> None:
+        """Update the statistics, killers and history for a cutoff."""
+        self.n_cutoffs += 1
+        if index == 0:
+            self.n_first_move_cutoffs += 1
+        if not self.move_ordering:
+            return
+        killers = self.killers[ply]
+        if action is not killers[0]:
+            killers[1] = killers[0]
+            killers[0] = action
+        self.history[player][action.coords.ix] += depth * depth
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        """Fraction of the cutoffs caused by the first move searched."""
+        return 0 if self.n_cutoffs == 0 else self.n_first_move_cutoffs / self.n_cutoffs
+
+    @property
+    def anytime(self) -> bool:
+        return self.time_budget is not None or self.node_budget is not None
+
+    def check_budget(self) -> None:
+        """Count a node, raising BudgetExhausted if the budget has run out."""
+        self.n_nodes += 1
+        if self._deadline is None:
+            return
+        if self.node_budget is not None and self.n_nodes > self.node_budget:
+            raise BudgetExhausted()
+        if self.time_budget is not None and self.n_nodes % 64 == 0 \
+                and time.perf_counter() > self._deadline:
+            raise BudgetExhausted()
 
-        self.play_as = play_as
-        self.depth = search_depth
-        self.evaluation_function = lambda state: eval_func(state, self.play_as)
     def play(self, state: othello.State) -> Optional[othello.Action]:
         
-        def minmax(gameState: othello.State, agent: othello.Player, depth: int, alpha: float, beta: float) -> float:
-            if depth == 0 or gameState.is_terminal() :
-                return self.evaluation_function(gameState)
+        def minmax(gameState, agent: othello.Player, depth: int, alpha: float, beta: float) -> float:
+            self.check_budget()
+            if gameState.is_terminal():
+                return self.evaluate(gameState)
+            if depth == 0:
+                self._horizon = True
+                return self.evaluate(gameState)
+
+            key = None
+            tt_move = None
+            if self.tt is not None:
+                key = gameState.hash_key(agent)
+                entry = self.tt.probe(key)
+                if entry is not None:
+                    tt_move = entry.move
+                    score = self.tt.cutoff(entry, depth, alpha, beta)
+                    if score is not None:
+                        # The entry may come from a search cut by the
+                        # horizon.
+                        self._horizon = True
+                        if depth == self._plies:
+                            self._root_move = entry.move
+                        return score
+            original_alpha, original_beta = alpha, beta
             
-            moves = gameState.get_legal_actions(agent)
+            moves = self.successors(gameState, agent)
             # when there is no action , this node has only 1 child, no search is needed
-            if moves is None:
+            if moves == []:
                 return minmax(gameState, agent.adversary, depth-1, alpha, beta)
+            ply = self._plies - depth
+            if self.move_ordering and len(moves) > 1:
+                moves = self.order_moves(gameState, agent, moves, tt_move, ply)
             
             v = None
+            best_move = None
             if agent == self.play_as: # max node
                 v = float('-inf')
-                for m in moves:
-                    nextState = gameState.perform_action(agent,m)
+                for i, (m, child) in enumerate(moves):
                     nextAgent = agent.adversary
                     nextDepth = depth-1
-                    score = minmax(nextState , nextAgent, nextDepth, alpha, beta)
-                    v = max(v, score)
+                    if self.search == 'pvs' and i > 0:
+                        score = self.search_child(gameState, agent, m, child, minmax, nextAgent, nextDepth, alpha, alpha)
+                        if alpha < score <= beta:
+                            score = self.search_child(gameState, agent, m, child, minmax, nextAgent, nextDepth, alpha, beta)
+                    else:
+                        score = self.search_child(gameState, agent, m, child, minmax, nextAgent, nextDepth, alpha, beta)
+                    if score > v:
+                        v = score
+                        best_move = m
                     alpha = max(alpha, v)
                     if v > beta:
+                        self.record_cutoff(agent, m, i, depth, ply)
                         break
             else: # min Node
                 v = float('inf')
-                for m in moves:
-                    nextState = gameState.perform_action(agent,m)
+                for i, (m, child) in enumerate(moves):
                     nextAgent = agent.adversary
                     nextDepth = depth-1
-                    score = minmax(nextState , nextAgent, nextDepth, alpha, beta)
-                    v = min(v, score)
+                    if self.search == 'pvs' and i > 0:
+                        score = self.search_child(gameState, agent, m, child, minmax, nextAgent, nextDepth, beta, beta)
+                        if alpha <= score < beta:
+                            score = self.search_child(gameState, agent, m, child, minmax, nextAgent, nextDepth, alpha, beta)
+                    else:
+                        score = self.search_child(gameState, agent, m, child, minmax, nextAgent, nextDepth, alpha, beta)
+                    if score < v:
+                        v = score
+                        best_move = m
                     beta = min(beta, v)
                     if v < alpha:
+                        self.record_cutoff(agent, m, i, depth, ply)
                         break
+
+            if key is not None:
+                # Scores are from the point of view of self.play_as at every
+                # node, so the bounds are those of the original window. Nodes
+                # are only cut off by scores strictly outside the window, so a
+                # score within it, ends included, is exact.
+                if v < original_alpha:
+                    bound = Bound.UPPER
+                elif v > original_beta:
+                    bound = Bound.LOWER
+                else:
+                    bound = Bound.EXACT
+                self.tt.store(key, depth, bound, v, best_move)
+            if ply == 0:
+                self._root_move = best_move
             return v
 
-        moves = list(state.get_legal_actions(self.play_as))
+        root = self.search_root(state)
+        moves = self.successors(root, self.play_as)
+        if self.tt is not None:
+            self.tt.new_search()
 
         if len(moves) == 0:
             return None
 
-        max_score = float('-inf')
-        best_move = moves[0]
-        for m in moves:
-            score = minmax(state.perform_action(self.play_as,m), self.play_as.adversary ,  2*self.depth - 1, max_score, float('inf'))
-            if score > max_score:
-                best_move = m
-                max_score = score
+        for history in self.history.values():
+            history[:] = [score // 2 for score in history]
+
+        def search_moves(plies: int, alpha: float, beta: float) -> tuple[othello.Action, float]:
+            """Search the root moves plies deep with the window (alpha, beta).
+
+            Stops at the first move scoring more than beta.
+            """
+            self._plies = plies
+            max_score = float('-inf')
+            best_move = moves[0][0]
+            for i, (m, child) in enumerate(moves):
+                a = max(alpha, max_score)
+                if self.search == 'pvs' and i > 0:
+                    score = self.search_child(root, self.play_as, m, child, minmax, self.play_as.adversary ,  plies - 1, a, a)
+                    if a < score <= beta:
+                        score = self.search_child(root, self.play_as, m, child, minmax, self.play_as.adversary ,  plies - 1, a, beta)
+                else:
+                    score = self.search_child(root, self.play_as, m, child, minmax, self.play_as.adversary ,  plies - 1, a, beta)
+                if score > max_score:
+                    best_move = m
+                    max_score = score
+                if max_score > beta:
+                    break
+            return best_move, max_score
+
+        def mtdf(plies: int, guess: float) -> tuple[othello.Action, float]:
+            """Search the root plies deep by MTD(f) from guess."""
+            self._plies = plies
+            best_move = moves[0][0]
+            lower, upper = float('-inf'), float('inf')
+            score = guess
+            while lower < upper:
+                gamma = score
+                score = minmax(root, self.play_as, plies, gamma, gamma)
+                if score < gamma:
+                    upper = score
+                else:
+                    # The root move is only meaningful when the search does
+                    # not fail low.
+                    best_move = self._root_move
+                    if score > gamma:
+                        lower = score
+                    else:
+                        lower = upper = score
+            return best_move, score
+
+        self.n_nodes = 0
+        if not self.anytime:
+            if self.search == 'mtdf':
+                best_move, self.score = mtdf(2*self.depth, self.evaluate(root))
+            else:
+                best_move, self.score = search_moves(2*self.depth, float('-inf'), float('inf'))
+            self.completed_plies = 2*self.depth
+            return best_move
+
+        # Anytime mode. The budget is only enforced once the first iteration
+        # is complete, so that there is always a move to return.
+        self._deadline = None
+        start_time = time.perf_counter()
+        best_move, score = moves[0][0], None
+        self.completed_plies = 0
+        try:
+            for plies in range(1, self.MAX_PLIES + 1):
+                self._horizon = False
+                if self.search == 'mtdf':
+                    best_move, score = mtdf(plies, self.evaluate(root) if score is None else score)
+                elif score is None:
+                    best_move, score = search_moves(plies, float('-inf'), float('inf'))
+                else:
+                    alpha = score - self.aspiration_window
+                    beta = score + self.aspiration_window
+                    move, new_score = search_moves(plies, alpha, beta)
+                    if new_score < alpha or new_score > beta:
+                        # Outside the window: the score is only a bound.
+                        move, new_score = search_moves(plies, float('-inf'), float('inf'))
+                    best_move, score = move, new_score
+                self.completed_plies = plies
+                self.score = score
+
+                if not self._horizon:
+                    break  # The search has reached the end of the game.
+
+                # Search the best move first in the next iteration.
+                moves.sort(key=lambda x: x[0] != best_move)
+
+                if self._deadline is None:
+                    self._deadline = start_time + (self.time_budget if self.time_budget is not None else float('inf'))
+        except BudgetExhausted:
+            pass
+        finally:
+            self._deadline = None
+
         return best_move
 
 
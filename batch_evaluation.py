@@ -0,0 +1,93 @@
+"""Vectorised heuristics of the ``evaluation`` module.
+
+Every function takes the dark and light board arrays of ``batch_othello`` and
+the player evaluated for, and returns an array of the scores the corresponding
+heuristic gives to every board. Use ``evaluation.evaluate_batch`` to evaluate
+boards with any evaluation function.
+
+This module requires NumPy.
+"""
+
+import numpy as np
+
+import batch_othello
+import evaluation
+import othello
+
+_EDGE_MASK = np.uint64(othello.EDGE_MASK)
+_CORNER_MASK = np.uint64(othello.CORNER_MASK)
+
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(x: np.ndarray) -> np.ndarray:
+        """Vectorised ``othello.popcount``."""
+        return np.bitwise_count(x).astype(np.int64)
+else:
+    # Number of set bits of every byte.
+    _BYTE_POPCOUNTS = np.array([bin(i).count('1') for i in range(256)],
+                               dtype=np.int64)
+
+    def popcount(x: np.ndarray) -> np.ndarray:
+        """Vectorised ``othello.popcount``."""
+        x = np.ascontiguousarray(x, dtype=np.uint64)
+        return _BYTE_POPCOUNTS[x.view(np.uint8).reshape(x.shape + (8,))] \
+            .sum(axis=-1)
+
+
+def _own(dark: np.ndarray, light: np.ndarray, player: othello.Player) \
+        -> np.ndarray:
+    return dark if player is othello.Player.DARK else light
+
+
+def number(dark: np.ndarray, light: np.ndarray, player: othello.Player) \
+        -> np.ndarray:
+    """Vectorised ``evaluation.heuristic_eval_number``."""
+    return popcount(_own(dark, light, player))
+
+
+def edge(dark: np.ndarray, light: np.ndarray, player: othello.Player) \
+        -> np.ndarray:
+    """Vectorised ``evaluation.heuristic_eval_edge``."""
+    return popcount(_own(dark, light, player) & _EDGE_MASK)
+
+
+def corner(dark: np.ndarray, light: np.ndarray, player: othello.Player) \
+        -> np.ndarray:
+    """Vectorised ``evaluation.heuristic_eval_corner``."""
+    return popcount(_own(dark, light, player) & _CORNER_MASK)
+
+
+def n_action(dark: np.ndarray, light: np.ndarray, player: othello.Player) \
+        -> np.ndarray:
+    """Vectorised ``evaluation.heuristic_eval_n_action``."""
+    return popcount(batch_othello.mobility(dark, light, player))
+
+
+def adversary_n_action(dark: np.ndarray, light: np.ndarray,
+                       player: othello.Player) -> np.ndarray:
+    """Vectorised ``evaluation.heuristic_eval_adversary_n_action``."""
+    return -popcount(batch_othello.mobility(dark, light, player.adversary))
+
+
+def features(dark: np.ndarray, light: np.ndarray, player: othello.Player) \
+        -> np.ndarray:
+    """Vectorised ``evaluation.extract_features``.
+
+    Returns an array with a trailing axis of the features, ordered as
+    ``evaluation.FEATURE_NAMES``.
+    """
+    return np.stack([number(dark, light, player), edge(dark, light, player),
+                     corner(dark, light, player), n_action(dark, light, player),
+                     adversary_n_action(dark, light, player)], axis=-1)
+
+
+def comprehensive(dark: np.ndarray, light: np.ndarray,
+                  player: othello.Player) -> np.ndarray:
+    """Vectorised ``evaluation.heuristic_eval_comprehensive``."""
+    return features(dark, light, player) @ np.array(othello.SCORE_WEIGHTS)
+
+
+def linear(dark: np.ndarray, light: np.ndarray, player: othello.Player) \
+        -> np.ndarray:
+    """Vectorised ``evaluation.heuristic_eval_linear``."""
+    return features(dark, light, player) @ np.array(evaluation.WEIGHTS)
@@ -0,0 +1,235 @@
+"""Batched game mechanics over NumPy arrays of boards.
+
+Boards are given as two ``uint64`` arrays of the same shape, holding the
+``dark_board`` and ``light_board`` words of ``othello.Board``. Every function
+processes all boards at once with vectorised operations, and its results match
+the corresponding methods of ``othello.State`` exactly.
+
+This module requires NumPy.
+"""
+
+from typing import Iterable, Union
+
+import numpy as np
+
+import othello
+
+_FULL = np.uint64(0xffffffffffffffff)
+_NOT_FILE_A = np.uint64(0xfefefefefefefefe)
+_NOT_FILE_H = np.uint64(0x7f7f7f7f7f7f7f7f)
+_ZERO = np.uint64(0)
+_ONE = np.uint64(1)
+
+# See othello._SHIFTS.
+_SHIFTS = tuple((np.uint64(s), lmask, rmask) for s, lmask, rmask in (
+    (1, _NOT_FILE_A, _NOT_FILE_H),
+    (7, _NOT_FILE_H, _NOT_FILE_A),
+    (8, _FULL, _FULL),
+    (9, _NOT_FILE_A, _NOT_FILE_H),
+))
+
+
+def boards_from_states(states: Iterable[othello.State]) \
+        -> tuple[np.ndarray, np.ndarray]:
+    """Convert states to the dark and light board arrays."""
+    states = list(states)
+    dark = np.fromiter((s.board.dark_board for s in states), dtype=np.uint64,
+                       count=len(states))
+    light = np.fromiter((s.board.light_board for s in states),
+                        dtype=np.uint64, count=len(states))
+    return dark, light
+
+
+def states_from_boards(dark: np.ndarray, light: np.ndarray) \
+        -> list[othello.State]:
+    """Convert dark and light board arrays to states."""
+    return [othello.State.unchecked(othello.Board.unchecked(d, l))
+            for d, l in zip(dark.ravel().tolist(), light.ravel().tolist())]
+
+
+# Record layouts of ``othello.State.to_bytes`` and ``othello.Game.to_bytes``,
+# where ``next_player`` is 0 for dark and 1 for light.
+STATE_DTYPE = np.dtype([('dark_board', '<u8'), ('light_board', '<u8')])
+GAME_DTYPE = np.dtype([('dark_board', '<u8'), ('light_board', '<u8'),
+                       ('next_player', 'u1')])
+
+
+def boards_from_bytes(data) -> tuple[np.ndarray, np.ndarray]:
+    """Get the dark and light board arrays from ``othello.pack_states`` data.
+
+    data is any buffer. The arrays are views of it, not copies.
+    """
+    records = np.frombuffer(data, dtype=STATE_DTYPE)
+    return records['dark_board'], records['light_board']
+
+
+def boards_to_bytes(dark: np.ndarray, light: np.ndarray) -> bytes:
+    """Serialise dark and light board arrays as ``othello.pack_states`` does.
+    """
+    records = np.empty(np.shape(dark), dtype=STATE_DTYPE)
+    records['dark_board'] = dark
+    records['light_board'] = light
+    return records.tobytes()
+
+
+def _own_opp(dark: np.ndarray, light: np.ndarray, player: othello.Player) \
+        -> tuple[np.ndarray, np.ndarray]:
+    if player is othello.Player.DARK:
+        return dark, light
+    else:  # player is othello.Player.LIGHT
+        return light, dark
+
+
+def bitboard_mobility(own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    """Vectorised ``othello.bitboard_mobility``."""
+    empty = ~(own | opp)
+    moves = np.zeros_like(own)
+
+    for s, lmask, rmask in _SHIFTS:
+        s2 = s << _ONE
+        s4 = s2 << _ONE
+
+        pro = opp & lmask
+        gen = own | (pro & (own << s))
+        pro &= pro << s
+        gen |= pro & (gen << s2)
+        pro &= pro << s2
+        gen |= pro & (gen << s4)
+        moves |= ((gen & opp) << s) & lmask & empty
+
+        pro = opp & rmask
+        gen = own | (pro & (own >> s))
+        pro &= pro >> s
+        gen |= pro & (gen >> s2)
+        pro &= pro >> s2
+        gen |= pro & (gen >> s4)
+        moves |= ((gen & opp) >> s) & rmask & empty
+
+    return moves
+
+
+def bitboard_flips(own: np.ndarray, opp: np.ndarray, ix: np.ndarray) \
+        -> np.ndarray:
+    """Vectorised ``othello.bitboard_flips``.
+
+    ix holds the square of the move on each board. It is broadcast against own
+    and opp.
+
+    From the move square, the run of adversary pieces in each direction is
+    found with an occluded fill. The run is flipped iff the square just beyond
+    it holds an own piece.
+    """
+    move = _ONE << np.asarray(ix, dtype=np.uint64)
+    flips = np.zeros(np.broadcast(own, opp, move).shape, dtype=np.uint64)
+
+    for s, lmask, rmask in _SHIFTS:
+        s2 = s << _ONE
+        s4 = s2 << _ONE
+
+        pro = opp & lmask
+        gen = move | (pro & (move << s))
+        pro &= pro << s
+        gen |= pro & (gen << s2)
+        pro &= pro << s2
+        gen |= pro & (gen << s4)
+        run = gen & opp
+        flips |= np.where(((run << s) & lmask & own) != _ZERO, run, _ZERO)
+
+        pro = opp & rmask
+        gen = move | (pro & (move >> s))
+        pro &= pro >> s
+        gen |= pro & (gen >> s2)
+        pro &= pro >> s2
+        gen |= pro & (gen >> s4)
+        run = gen & opp
+        flips |= np.where(((run >> s) & rmask & own) != _ZERO, run, _ZERO)
+
+    return np.where(((own | opp) & move) != _ZERO, _ZERO, flips)
+
+
+def mobility(dark: np.ndarray, light: np.ndarray, player: othello.Player) \
+        -> np.ndarray:
+    """Get the ``othello.State.mobility_mask`` of player for every board."""
+    own, opp = _own_opp(dark, light, player)
+    return bitboard_mobility(own, opp)
+
+
+def flips(dark: np.ndarray, light: np.ndarray, player: othello.Player,
+          ix: Union[int, np.ndarray]) -> np.ndarray:
+    """Get the ``othello.State.get_flips`` of player playing ix on every board.
+    """
+    own, opp = _own_opp(dark, light, player)
+    return bitboard_flips(own, opp, np.asarray(ix))
+
+
+def perform(dark: np.ndarray, light: np.ndarray, player: othello.Player,
+            ix: Union[int, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """Perform the action at square ix on behalf of player on every board.
+
+    Returns the dark and light boards of the successors, as in
+    ``othello.State.perform_action``. Raises ValueError if any of the actions
+    is illegal.
+    """
+    mask = flips(dark, light, player, ix)
+    if not np.all(mask != _ZERO):
+        raise ValueError('illegal action')
+
+    placed = _ONE << np.asarray(ix, dtype=np.uint64)
+
+    if player is othello.Player.DARK:
+        return dark | placed | mask, light & ~mask
+    else:  # player is othello.Player.LIGHT
+        return dark & ~mask, light | placed | mask
+
+
+def expand(dark: np.ndarray, light: np.ndarray, player: othello.Player) \
+        -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Generate every successor of every board, for moves by player.
+
+    dark and light must be 1-dimensional. Returns the arrays
+    ``(parent, ix, flip_mask, child_dark, child_light)``, with one element per
+    successor: ``parent`` is the index of the board it is reached from and
+    ``ix`` the square played. The successors are ordered by parent, then by
+    square, i.e. in the order of ``othello.State.get_legal_actions``. Boards
+    where player has to pass have no successor.
+    """
+    moves = mobility(dark, light, player)
+
+    parents = []
+    squares = []
+    for ix in range(64):
+        (parent,) = np.nonzero((moves >> np.uint64(ix)) & _ONE)
+        parents.append(parent)
+        squares.append(np.full(parent.shape, ix, dtype=np.uint64))
+
+    parent = np.concatenate(parents)
+    ix = np.concatenate(squares)
+    order = np.lexsort((ix, parent))
+    parent = parent[order]
+    ix = ix[order]
+
+    own, opp = _own_opp(dark[parent], light[parent], player)
+    mask = bitboard_flips(own, opp, ix)
+    placed = _ONE << ix
+
+    own = own | placed | mask
+    opp = opp & ~mask
+    child_dark, child_light = _own_opp(own, opp, player)
+
+    return parent, ix, mask, child_dark, child_light
+
+
+class NumpyBackend(othello.Backend):
+    """``othello.Backend`` running the vectorised functions on single boards.
+
+    It is much slower than ``othello.BitboardBackend`` on single boards, and is
+    meant for checking this module against the other backends.
+    """
+
+    name = 'numpy'
+
+    def mobility(self, own: int, opp: int) -> int:
+        return int(bitboard_mobility(np.uint64(own), np.uint64(opp)))
+
+    def flips(self, own: int, opp: int, ix: int) -> int:
+        return int(bitboard_flips(np.uint64(own), np.uint64(opp), ix))
@@ -0,0 +1,262 @@
+"""Micro-benchmarks of the game engine.
+
+Usage: python3 benchmark.py [name ...]
+
+Runs the named benchmarks, or all of them if none is given.
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+import othello
+
+
+def sample_states(n_games: int, seed: int = 0) \
+        -> list[tuple[othello.State, othello.Player]]:
+    """Collect the (state, player to move) pairs visited by random games."""
+    rng = random.Random(seed)
+    samples = []
+
+    for _ in range(n_games):
+        state = othello.State.initial()
+        player = othello.Player.DARK
+
+        while state.get_conclusion() is None:
+            samples.append((state, player))
+
+            legal_actions = list(state.get_legal_actions(player))
+            if legal_actions != []:
+                state = state.perform_action(player, rng.choice(legal_actions))
+            player = player.adversary
+
+    return samples
+
+
+def measure(func: Callable[[], int], min_time: float = 1.) -> float:
+    """Call func repeatedly for at least min_time seconds.
+
+    func returns the number of operations it performed. Returns the number of
+    operations per second.
+    """
+    n_ops = 0
+    start_time = time.perf_counter()
+
+    while (elapsed := time.perf_counter() - start_time) < min_time:
+        n_ops += func()
+
+    return n_ops / elapsed
+
+
+def bench_flips() -> None:
+    """Flip computations per second, over all squares of sampled positions."""
+    samples = sample_states(10)
+    actions = [othello.Action(othello.Coords(i)) for i in range(64)]
+    words = [(s.board.dark_board, s.board.light_board)
+             if p is othello.Player.DARK
+             else (s.board.light_board, s.board.dark_board)
+             for s, p in samples]
+
+    def reference() -> int:
+        for state, player in samples:
+            for action in actions:
+                state.get_flips_reference(player, action)
+        return len(samples) * 64
+
+    def bitboard() -> int:
+        for own, opp in words:
+            for ix in range(64):
+                othello.bitboard_flips(own, opp, ix)
+        return len(words) * 64
+
+    print(f'flips/s  reference: {measure(reference):12.0f}')
+    print(f'flips/s  bitboard:  {measure(bitboard):12.0f}')
+
+
+def bench_perform_action() -> None:
+    """Successor states per second, and memory held per stored state."""
+    samples = sample_states(10)
+    moves = [(state, player, list(state.get_legal_actions(player)))
+             for state, player in samples]
+
+    def perform_action() -> int:
+        n_ops = 0
+        for state, player, legal_actions in moves:
+            for action in legal_actions:
+                state.perform_action(player, action)
+            n_ops += len(legal_actions)
+        return n_ops
+
+    print(f'perform_action/s:   {measure(perform_action):12.0f}')
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    children = [state.perform_action(player, action)
+                for state, player, legal_actions in moves
+                for action in legal_actions]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f'bytes/stored state: {(after - before) / len(children):12.1f}')
+
+
+def bench_batch() -> None:
+    """Successors per second, one state at a time and batched with NumPy."""
+    import batch_othello
+
+    samples = sample_states(20)
+    batches = [(player, *batch_othello.boards_from_states(
+                    s for s, p in samples if p is player))
+               for player in othello.Player]
+
+    def scalar() -> int:
+        n_ops = 0
+        for state, player in samples:
+            for action in state.get_legal_actions(player):
+                state.perform_action(player, action)
+                n_ops += 1
+        return n_ops
+
+    def batched() -> int:
+        n_ops = 0
+        for player, dark, light in batches:
+            n_ops += len(batch_othello.expand(dark, light, player)[0])
+        return n_ops
+
+    print(f'successors/s  scalar:  {measure(scalar):12.0f}')
+    print(f'successors/s  batched: {measure(batched):12.0f}')
+
+
+def bench_stable() -> None:
+    """Stable-disc computations per second, over sampled positions."""
+    samples = sample_states(10)
+    words = [(s.board.dark_board, s.board.light_board) for s, _ in samples]
+
+    def stable() -> int:
+        for own, opp in words:
+            othello.bitboard_stable(own, opp)
+        return len(words)
+
+    def features() -> int:
+        for state, player in samples:
+            state.features(player)
+        return len(samples)
+
+    print(f'calls/s  stable:   {measure(stable):12.0f}')
+    print(f'calls/s  features: {measure(features):12.0f}')
+
+
+def bench_backends() -> None:
+    """Throughput of every backend, checked against the bitboard backend."""
+    for name in othello.BACKENDS:
+        if name == 'bitboard':
+            continue
+
+        try:
+            other = othello.make_backend(name)
+        except ImportError:
+            print(f'{name}: not available')
+            continue
+
+        backend = othello.differential_check(othello.BitboardBackend(), other,
+                                             5)
+        n_calls = sum(backend.n_calls.values())
+        for position, elapsed in backend.elapsed.items():
+            n = getattr(backend, position).name
+            print(f'calls/s  {n:>9}: {n_calls / elapsed:12.0f}')
+
+
+def bench_evaluate_batch() -> None:
+    """Evaluations per second, one state at a time and batched."""
+    import batch_othello
+    import evaluation
+    import pattern_evaluation
+
+    samples = sample_states(10)
+    states = [s for s, _ in samples]
+    dark, light = batch_othello.boards_from_states(states)
+
+    for name, eval_func in (
+            ('comprehensive', evaluation.heuristic_eval_comprehensive),
+            ('pattern', pattern_evaluation.pattern_eval)):
+        def one_at_a_time() -> int:
+            for state in states:
+                eval_func(othello.State(state.board), othello.Player.DARK)
+            return len(states)
+
+        def batched() -> int:
+            evaluation.evaluate_batch(eval_func, dark, light,
+                                      othello.Player.DARK)
+            return len(states)
+
+        print(f'evaluations/s  {name:>13} one at a time: '
+              f'{measure(one_at_a_time):12.0f}')
+        print(f'evaluations/s  {name:>13} batched:       '
+              f'{measure(batched):12.0f}')
+
+
+def bench_move_ordering() -> None:
+    """Nodes searched by AlphaBetaAgent, with and without move ordering."""
+    from alpha_beta_agent import AlphaBetaAgent
+
+    samples = sample_states(1)[8:48:8]
+
+    for move_ordering in (False, True):
+        n_nodes = n_cutoffs = n_first_move_cutoffs = 0
+        start_time = time.perf_counter()
+        for state, player in samples:
+            agent = AlphaBetaAgent(player, 2, move_ordering=move_ordering)
+            agent.play(state)
+            n_nodes += agent.n_nodes
+            n_cutoffs += agent.n_cutoffs
+            n_first_move_cutoffs += agent.n_first_move_cutoffs
+        elapsed = time.perf_counter() - start_time
+
+        name = 'ordered' if move_ordering else 'unordered'
+        print(f'nodes  {name:>9}: {n_nodes:8}  '
+              f'first-move cutoffs: {n_first_move_cutoffs / n_cutoffs:.3f}  '
+              f'time: {elapsed:.3f}s')
+
+
+def bench_search() -> None:
+    """Nodes searched by each search of AlphaBetaAgent, per depth."""
+    from alpha_beta_agent import AlphaBetaAgent
+
+    samples = sample_states(1)[8:48:8]
+
+    for depth in (1, 2, 3):
+        for search in AlphaBetaAgent.SEARCHES:
+            n_nodes = 0
+            start_time = time.perf_counter()
+            for state, player in samples:
+                agent = AlphaBetaAgent(player, depth, search=search)
+                agent.play(state)
+                n_nodes += agent.n_nodes
+            elapsed = time.perf_counter() - start_time
+
+            print(f'nodes  depth {depth} {search:>9}: {n_nodes:8}  '
+                  f'time: {elapsed:.3f}s')
+
+
+BENCHMARKS: dict[str, Callable[[], None]] = {
+    'flips': bench_flips,
+    'perform_action': bench_perform_action,
+    'batch': bench_batch,
+    'backends': bench_backends,
+    'stable': bench_stable,
+    'evaluate_batch': bench_evaluate_batch,
+    'move_ordering': bench_move_ordering,
+    'search': bench_search,
+}
+
+
+def run_benchmarks(names: list[str]) -> None:
+    for name in names or BENCHMARKS:
+        print(f'== {name}')
+        BENCHMARKS[name]()
+
+
+if __name__ == '__main__':
+    run_benchmarks(sys.argv[1:])
@@ -1,37 +1,288 @@
+import json
+import os
+
 import othello 
+from lru import LRUCache
+
+# Names of the features returned by extract_features, in order.
+FEATURE_NAMES = ('number', 'edge', 'corner', 'n_action', 'adversary_n_action')
+
+def extract_features(state:othello.State, player: othello.Player):
+    """Get the features of state for player, as a tuple ordered as FEATURE_NAMES.
+
+    Everything is computed in one pass over the bitboards. See
+    othello.State.features.
+    """
+    return state.features(player)
 
 def heuristic_eval_number(state:othello.State, player: othello.Player):
-        if player is othello.Player.DARK:
-            return f'{state.board.dark_board:b}'.count('1')
-        elif player is othello.Player.LIGHT:
-            return f'{state.board.light_board:b}'.count('1')
+    return state.n_number(player)
 
 def heuristic_eval_edge(state:othello.State, player: othello.Player):
-    n_edge = 0
-    edge_point = []
-    for i in range(2, 8):
-        edge_point.append('a' + str(i))
-        edge_point.append('h' + str(i))
-    for char in range(ord('b'), ord('h')):
-        edge_point.append(chr(char) + '1')
-        edge_point.append(chr(char) + '8')
-    for point in edge_point:
-        if state.board[Coords.from_repr(point)] is player:
-            n_edge += 1
-    return n_edge
+    return state.n_edge(player)
 
 def heuristic_eval_corner(state:othello.State, player: othello.Player):
-    n_corner = 0
-    for point in ['a1', 'a8', 'h1', 'h8']:
-        if state.board[Coords.from_repr(point)] is player:
-            n_corner += 1
-    return n_corner
+    return state.n_corner(player)
 
 def heuristic_eval_n_action(state:othello.State, player: othello.Player):
-    return len(list(state.get_legal_actions(player)))
+    return state.n_action(player)
 
 def heuristic_eval_adversary_n_action(state:othello.State, player: othello.Player):
-    return -len(list(state.get_legal_actions(player.adversary)))
+    return state.adversary_n_action(player)
+
+def heuristic_eval_stable(state:othello.State, player: othello.Player):
+    return state.n_stable(player) - state.n_stable(player.adversary)
 
 def heuristic_eval_comprehensive(state:othello.State, player: othello.Player):
-	return state.get_score(player)
\ No newline at end of file
+	return state.get_score(player)
+
+
+# Environment variable giving the path of the weight file of
+# heuristic_eval_linear.
+WEIGHTS_ENV = 'OTHELLO_EVAL_WEIGHTS'
+
+DEFAULT_WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    'evaluation_weights.json')
+
+def load_weights(path: str) -> tuple[float, ...]:
+    """Load the weights of the features from a JSON file.
+
+    The file holds an object mapping every name of FEATURE_NAMES to its weight.
+    Returns the weights ordered as FEATURE_NAMES.
+    """
+    with open(path) as f:
+        weights = json.load(f)
+
+    try:
+        return tuple(float(weights[name]) for name in FEATURE_NAMES)
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f'invalid evaluation weights in {path}')
+
+def save_weights(weights, path: str) -> None:
+    """Save the weights of the features, ordered as FEATURE_NAMES."""
+    if len(weights) != len(FEATURE_NAMES):
+        raise ValueError('invalid evaluation weights')
+
+    with open(path, 'w') as f:
+        json.dump({name: float(w) for name, w in zip(FEATURE_NAMES, weights)},
+                  f, indent=4)
+
+def _default_weights() -> tuple[float, ...]:
+    path = os.environ.get(WEIGHTS_ENV)
+    if path is not None:
+        return load_weights(path)
+    if os.path.exists(DEFAULT_WEIGHTS_PATH):
+        return load_weights(DEFAULT_WEIGHTS_PATH)
+    return othello.SCORE_WEIGHTS
+
+# Weights of heuristic_eval_linear, loaded at startup from the file given by
+# the OTHELLO_EVAL_WEIGHTS environment variable, then evaluation_weights.json
+# next to this module. Without a file, they are those of
+# heuristic_eval_comprehensive. The train module fits them.
+WEIGHTS = _default_weights()
+
+def heuristic_eval_linear(state:othello.State, player: othello.Player):
+    """Weighted sum of the features, with the weights in WEIGHTS."""
+    return sum(w * f for w, f in zip(WEIGHTS, state.features(player)))
+
+
+class LinearEvaluation:
+    """Weighted sum of the features, with given weights.
+
+    Like heuristic_eval_linear, but each instance has its own weights, ordered
+    as FEATURE_NAMES.
+    """
+
+    def __init__(self, weights) -> None:
+        if len(weights) != len(FEATURE_NAMES):
+            raise ValueError('invalid evaluation weights')
+
+        self.weights = tuple(weights)
+
+    @staticmethod
+    def from_file(path: str) -> 'LinearEvaluation':
+        """Create an evaluation with weights loaded by load_weights."""
+        return LinearEvaluation(load_weights(path))
+
+    def __call__(self, state: othello.State, player: othello.Player):
+        return sum(w * f for w, f in zip(self.weights, state.features(player)))
+
+    def evaluate_batch(self, dark, light, player: othello.Player):
+        """Evaluate the boards of the arrays dark and light for player.
+
+        See evaluate_batch.
+        """
+        import batch_evaluation
+        import numpy as np
+        return batch_evaluation.features(dark, light, player) \
+            @ np.array(self.weights)
+
+
+class CachedEvaluation:
+    """Wrap an evaluation function with a bounded memo cache.
+
+    Scores are cached by board and player in an LRUCache of maxsize entries,
+    which evicts the least recently used ones. The wrapper can be passed as the
+    eval_func of any agent, and keeps its entries across moves. The cache
+    counters are exposed through the cache field.
+    """
+
+    def __init__(self, eval_func, maxsize: int =1 << 16) -> None:
+        self.eval_func = eval_func
+        self.cache: LRUCache[tuple[int, int, othello.Player], float] = \
+            LRUCache(maxsize)
+
+    def __call__(self, state: othello.State, player: othello.Player):
+        key = (state.board.dark_board, state.board.light_board, player)
+        score = self.cache.get(key)
+
+        if score is None:
+            score = self.eval_func(state, player)
+            self.cache.put(key, score)
+
+        return score
+
+    @property
+    def hit_rate(self) -> float:
+        return self.cache.hit_rate
+
+    def __repr__(self) -> str:
+        name = getattr(self.eval_func, '__name__', repr(self.eval_func))
+        return f'CachedEvaluation({name}, {self.cache!r})'
+
+
+class IncrementalEvaluation:
+    """Base class for evaluations updated incrementally during search.
+
+    An instance is attached to an othello.SearchPosition as a tracker. The
+    position calls make with the flip mask of every move and unmake when the
+    move is undone, so that the terms depending on the pieces only are kept up
+    to date. evaluate computes the remaining terms from the position.
+    """
+
+    def make(self, player: othello.Player, ix: int, flips: int) -> None:
+        raise NotImplementedError('method not overridden')
+
+    def unmake(self) -> None:
+        raise NotImplementedError('method not overridden')
+
+    def evaluate(self, position: othello.SearchPosition, player: othello.Player):
+        raise NotImplementedError('method not overridden')
+
+
+class IncrementalComprehensive(IncrementalEvaluation):
+    """Incremental heuristic_eval_comprehensive.
+
+    The number, edge and corner counts of both players are updated from the
+    squares that change. The mobilities are computed by evaluate. The scores
+    are those of heuristic_eval_comprehensive.
+    """
+
+    def __init__(self, state: othello.State) -> None:
+        # Counts of dark, then of light.
+        self.counts = (state.n_number(othello.Player.DARK),
+                       state.n_edge(othello.Player.DARK),
+                       state.n_corner(othello.Player.DARK),
+                       state.n_number(othello.Player.LIGHT),
+                       state.n_edge(othello.Player.LIGHT),
+                       state.n_corner(othello.Player.LIGHT))
+        self.history = []
+
+    def make(self, player: othello.Player, ix: int, flips: int) -> None:
+        self.history.append(self.counts)
+
+        placed = 1 << ix
+        n_flips = othello.popcount(flips)
+        n_edge_flips = othello.popcount(flips & othello.EDGE_MASK)
+        n_corner_flips = othello.popcount(flips & othello.CORNER_MASK)
+        edge = 1 if placed & othello.EDGE_MASK else 0
+        corner = 1 if placed & othello.CORNER_MASK else 0
+
+        (dark_number, dark_edge, dark_corner,
+         light_number, light_edge, light_corner) = self.counts
+
+        if player is othello.Player.DARK:
+            self.counts = (dark_number + 1 + n_flips,
+                           dark_edge + edge + n_edge_flips,
+                           dark_corner + corner + n_corner_flips,
+                           light_number - n_flips,
+                           light_edge - n_edge_flips,
+                           light_corner - n_corner_flips)
+        else:  # player is othello.Player.LIGHT
+            self.counts = (dark_number - n_flips,
+                           dark_edge - n_edge_flips,
+                           dark_corner - n_corner_flips,
+                           light_number + 1 + n_flips,
+                           light_edge + edge + n_edge_flips,
+                           light_corner + corner + n_corner_flips)
+
+    def unmake(self) -> None:
+        self.counts = self.history.pop()
+
+    def evaluate(self, position: othello.SearchPosition, player: othello.Player):
+        if player is othello.Player.DARK:
+            number, edge, corner = self.counts[:3]
+        else:  # player is othello.Player.LIGHT
+            number, edge, corner = self.counts[3:]
+
+        weights = othello.SCORE_WEIGHTS
+        return (weights[0] * number + weights[1] * edge + weights[2] * corner
+                + weights[3] * othello.popcount(position.mobility_mask(player))
+                - weights[4] * othello.popcount(
+                    position.mobility_mask(player.adversary)))
+
+
+def incremental(eval_func, state: othello.State):
+    """Get an IncrementalEvaluation of eval_func starting at state.
+
+    Returns None if eval_func has no incremental counterpart. An evaluation
+    function provides one with an incremental(state) method.
+    """
+    if eval_func is heuristic_eval_comprehensive:
+        return IncrementalComprehensive(state)
+    elif hasattr(eval_func, 'incremental'):
+        return eval_func.incremental(state)
+    else:
+        return None
+
+
+# Names of the functions of the batch_evaluation module vectorising the
+# heuristics.
+_BATCH_FUNCTIONS = {
+    heuristic_eval_number: 'number',
+    heuristic_eval_edge: 'edge',
+    heuristic_eval_corner: 'corner',
+    heuristic_eval_n_action: 'n_action',
+    heuristic_eval_adversary_n_action: 'adversary_n_action',
+    heuristic_eval_comprehensive: 'comprehensive',
+    heuristic_eval_linear: 'linear',
+}
+
+def has_batch(eval_func) -> bool:
+    """Check if evaluate_batch has a vectorised path for eval_func.
+
+    An evaluation function provides one with an evaluate_batch(dark, light,
+    player) method.
+    """
+    return eval_func in _BATCH_FUNCTIONS or hasattr(eval_func, 'evaluate_batch')
+
+def evaluate_batch(eval_func, dark, light, player: othello.Player):
+    """Evaluate many boards for player with eval_func at once.
+
+    dark and light are the board arrays of batch_othello. Returns the array of
+    the scores eval_func gives to the states of the boards. The heuristics of
+    this module and evaluation functions with an evaluate_batch method are
+    vectorised. Other evaluation functions are called on every board. Requires
+    NumPy.
+    """
+    if eval_func in _BATCH_FUNCTIONS:
+        import batch_evaluation
+        return getattr(batch_evaluation, _BATCH_FUNCTIONS[eval_func])(
+            dark, light, player)
+    elif hasattr(eval_func, 'evaluate_batch'):
+        return eval_func.evaluate_batch(dark, light, player)
+    else:
+        import batch_othello
+        import numpy as np
+        return np.array([eval_func(state, player) for state in
+                         batch_othello.states_from_boards(dark, light)])
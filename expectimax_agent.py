@@ -4,14 +4,40 @@ from typing import Optional
 import othello
 from log_referee import LogReferee
 import evaluation
+from search import SearchAgent
 
-class ExpectimaxAgent(othello.Agent):
-    def __init__(self, play_as: othello.Player, search_depth: int =2, eval_func=evaluation.heuristic_eval_comprehensive) -> None:
-        super().__init__()
+class ExpectimaxAgent(SearchAgent):
+    def __init__(self, play_as: othello.Player, search_depth: int =2, eval_func=evaluation.heuristic_eval_comprehensive, make_unmake: bool =False, batch: bool =False) -> None:
+        super().__init__(play_as, search_depth, eval_func, make_unmake)
+        # Evaluate the chance nodes at the search horizon below a max node with
+        # one call of evaluation.evaluate_batch. The results are the same.
+        # Requires NumPy.
+        self.batch = batch
+        # Score of the move chosen last.
+        self.score = None
 
-        self.play_as = play_as
-        self.depth = search_depth
-        self.evaluation_function = lambda state: eval_func(state, self.play_as)
+    def horizon_scores(self, node, player: othello.Player) -> list[float]:
+        """Get the scores of the children of node, player to move, as chance
+        nodes at the search horizon.
+        """
+        import batch_othello
+        parent = node.state if self.make_unmake else node
+        children = [child for _, child, _ in parent.children(player)]
+        dark, light = batch_othello.boards_from_states(children)
+        evaluations = evaluation.evaluate_batch(self.eval_func, dark, light, self.play_as).tolist()
+
+        scores = []
+        for child, e in zip(children, evaluations):
+            # Same arithmetic as expectimax in play.
+            n_actions = 0 if child.is_terminal() else othello.popcount(child.mobility_mask(player.adversary))
+            if n_actions == 0:
+                scores.append(e)
+            else:
+                score = 0.0
+                for _ in range(n_actions):
+                    score += e
+                scores.append(score / n_actions)
+        return scores
 
     def play(self, state: othello.State) -> Optional[othello.Action]:
         legal_actions = list(state.get_legal_actions(self.play_as))
@@ -20,42 +46,45 @@ class ExpectimaxAgent(othello.Agent):
         else:
             def expectimax(currentGameState, depth, player):
                 if currentGameState.is_terminal():
-                    return self.evaluation_function(currentGameState)
+                    return self.evaluate(currentGameState)
                 legal_actions = list(currentGameState.get_legal_actions(player))
                 if len(legal_actions) == 0:
-                    return self.evaluation_function(currentGameState)
+                    return self.evaluate(currentGameState)
                 scores = []
                 if player != self.play_as:
                     if depth == self.depth:
                         if len(legal_actions) == 0:
-                            return self.evaluation_function(currentGameState)
+                            return self.evaluate(currentGameState)
                         scores = 0.0
                         for action in legal_actions:
-                            childGameState = currentGameState.perform_action(player, action)
-                            scores += self.evaluation_function(currentGameState)
+                            scores += self.evaluate(currentGameState)
                         return scores / len(legal_actions)
                     else:
                         if len(legal_actions) == 0:
                             return expectimax(currentGameState, depth + 1, player.adversary)
                         scores = 0.0
-                        for action in legal_actions:
-                            childGameState = currentGameState.perform_action(player, action)
-                            scores += expectimax(childGameState, depth + 1, player.adversary)
+                        for action, child in self.successors(currentGameState, player):
+                            scores += self.search_child(currentGameState, player, action, child, expectimax, depth + 1, player.adversary)
                         return scores / len(legal_actions)
                 else:
                     if len(legal_actions) == 0:
                         return expectimax(currentGameState, depth, player.adversary)
-                    for action in legal_actions:
-                        childGameState = currentGameState.perform_action(player, action)
-                        scores.append(expectimax(childGameState, depth, player.adversary))
+                    if self.batch and depth == self.depth:
+                        return max(self.horizon_scores(currentGameState, player))
+                    for action, child in self.successors(currentGameState, player):
+                        scores.append(self.search_child(currentGameState, player, action, child, expectimax, depth, player.adversary))
                     return max(scores)    
 
             scores = []
             # Choose one of the best actions
-            for action in legal_actions:
-                childgameState = state.perform_action(self.play_as, action)
-                scores.append(expectimax(childgameState, 1, self.play_as.adversary))
+            root = self.search_root(state)
+            if self.batch and self.depth == 1:
+                scores = self.horizon_scores(root, self.play_as)
+            else:
+                for action, child in self.successors(root, self.play_as):
+                    scores.append(self.search_child(root, self.play_as, action, child, expectimax, 1, self.play_as.adversary))
             bestScore = max(scores)
+            self.score = bestScore
             bestIndices = [index for index in range(len(scores)) if scores[index] == bestScore]
             # Pick randomly among the best
             chosenIndex = random.choice(bestIndices) 
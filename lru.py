@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class LRUCache(Generic[K, V]):
+    """A bounded mapping that evicts the least recently used entries.
+
+    The cache keeps hit, miss and eviction counters so that its effectiveness
+    can be monitored. A maxsize of 0 disables caching altogether.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise ValueError('invalid maxsize')
+
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def resize(self, maxsize: int) -> None:
+        """Change the capacity, evicting entries if necessary."""
+        if maxsize < 0:
+            raise ValueError('invalid maxsize')
+
+        self._maxsize = maxsize
+        while len(self._data) > maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Get the value for key, or default if it is not cached."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        if self._maxsize == 0:
+            return
+
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+        if len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        """Remove all entries. The counters are kept."""
+        self._data.clear()
+
+    def reset_stats(self) -> None:
+        """Reset the hit, miss and eviction counters."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        n_lookups = self.hits + self.misses
+        return 0 if n_lookups == 0 else self.hits / n_lookups
+
+    def __repr__(self) -> str:
+        return (f'LRUCache(size={len(self)}/{self._maxsize}, '
+                f'hits={self.hits}, misses={self.misses}, '
+                f'evictions={self.evictions})')
@@ -6,11 +6,15 @@ from log_referee import LogReferee
 import evaluation
 
 class MaxAgent(othello.Agent):
-    def __init__(self, play_as: othello.Player, eval_func=evaluation.heuristic_eval_comprehensive) -> None:
+    def __init__(self, play_as: othello.Player, eval_func=evaluation.heuristic_eval_comprehensive, batch: bool =False) -> None:
         super().__init__()
 
         self.play_as = play_as
+        self.eval_func = eval_func
         self.evaluation_function = lambda state: eval_func(state, self.play_as)
+        # Evaluate all the children with one call of evaluation.evaluate_batch.
+        # Requires NumPy.
+        self.batch = batch
 
     def play(self, state: othello.State) -> Optional[othello.Action]:
         legal_actions = list(state.get_legal_actions(self.play_as))
@@ -24,10 +28,18 @@ class MaxAgent(othello.Agent):
             #     if next_state.get_score(self.play_as) > best_score:
             #         best_action = action
             option = []
-            for action in legal_actions:
-                next_state = state.perform_action(self.play_as, action)
-                score = self.evaluation_function(next_state)
-                option.append((action, score))
+            if self.batch:
+                import batch_othello
+                children = state.children(self.play_as)
+                dark, light = batch_othello.boards_from_states(
+                    next_state for _, next_state, _ in children)
+                scores = evaluation.evaluate_batch(self.eval_func, dark, light, self.play_as)
+                option = [(action, score) for (action, _, _), score
+                          in zip(children, scores.tolist())]
+            else:
+                for action, next_state, _ in state.children(self.play_as):
+                    score = self.evaluation_function(next_state)
+                    option.append((action, score))
             best_action = max(option ,key=lambda item:item[1])[0]
             return best_action
 
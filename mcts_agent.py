@@ -1,5 +1,6 @@
 from collections import defaultdict
 from dataclasses import dataclass, field
+import json
 from math import log, sqrt
 import random
 from typing import Optional
@@ -40,45 +41,56 @@ class MCTSAgent(othello.Agent):
         self.n_iters = n_iters
         self.c = c
 
-        self.mcts_tree: defaultdict[tuple[othello.Player, othello.State],
-                                    MCTSTreeData] \
+        # Keyed by othello.State.hash_key(player), where player is the player
+        # who has just moved into the state.
+        self.mcts_tree: defaultdict[int, MCTSTreeData] \
             = defaultdict(lambda: MCTSTreeData())
 
+    @staticmethod
+    def from_file(play_as: othello.Player, path: str, n_iters: int =100) -> 'MCTSAgent':
+        """Create an agent with the parameters in a JSON file, e.g. written by
+        tune.py. The file holds an object with the c constant.
+        """
+        with open(path) as f:
+            parameters = json.load(f)
+
+        return MCTSAgent(play_as, n_iters, float(parameters['c']))
+
     def play(self, state: othello.State) -> Optional[othello.Action]:
         for _ in range(self.n_iters):
             cur_state = state
             player = self.play_as.adversary
-            visited = [(player, cur_state)]
+            visited = [(player, cur_state.hash_key(player))]
 
             # Selection & Expansion.
 
             while cur_state.get_conclusion() is None:
                 player = player.adversary
-                legal_actions = list(cur_state.get_legal_actions(player))
+                next_states = [s for _, s, _ in cur_state.children(player)]
 
-                if legal_actions != []:
-                    next_states = [cur_state.perform_action(
-                        player, action) for action in legal_actions]
+                if next_states != []:
+                    next_keys = [s.hash_key(player) for s in next_states]
                     not_played_states \
-                        = [s for s in next_states
-                           if self.mcts_tree[player, s].play_count == 0]
+                        = [(s, key) for s, key in zip(next_states, next_keys)
+                           if self.mcts_tree[key].play_count == 0]
 
                     if not_played_states == []:
-                        log_n = log(sum(self.mcts_tree[player, s].play_count
-                                        for s in next_states))
+                        log_n = log(sum(self.mcts_tree[key].play_count
+                                        for key in next_keys))
 
-                        def ucb(s: othello.State) -> float:
-                            wr = self.mcts_tree[player, s].win_rate
-                            pc = self.mcts_tree[player, s].play_count
+                        def ucb(x: tuple[othello.State, int]) -> float:
+                            wr = self.mcts_tree[x[1]].win_rate
+                            pc = self.mcts_tree[x[1]].play_count
                             return wr + self.c * sqrt(log_n / pc)
 
-                        cur_state = max(next_states, key=ucb)
-                        visited.append((player, cur_state))
+                        cur_state, key = max(zip(next_states, next_keys),
+                                             key=ucb)
+                        visited.append((player, key))
                     else:
                         # Removing type annotation causes error here.
-                        cur_state: othello.State = random.choice(
-                            not_played_states)
-                        visited.append((player, cur_state))
+                        cur_state: othello.State
+                        cur_state, key = random.choice(not_played_states)
+                        visited.append((player, key))
                         break
 
             # Simulation.
@@ -88,13 +100,13 @@ class MCTSAgent(othello.Agent):
                 legal_actions = list(cur_state.get_legal_actions(player))
 
                 if legal_actions != []:
-                    next_states = [cur_state.perform_action(
-                        player, action) for action in legal_actions]
-                    cur_state = random.choice(next_states)
+                    action = random.choice(legal_actions)
+                    cur_state = cur_state.perform_action_unchecked(
+                        player, action, cur_state.get_flips(player, action))
 
             # Backpropagation.
 
-            for player, s in visited:
+            for player, key in visited:
                 if conclusion is othello.DRAW:
                     delta_wc = .5
                 elif conclusion is player:
@@ -102,19 +114,17 @@ class MCTSAgent(othello.Agent):
                 else:  # if conclusion is player.adversary
                     delta_wc = 0
 
-                self.mcts_tree[player, s] \
-                    = self.mcts_tree[player, s].register_win(delta_wc)
+                self.mcts_tree[key] = self.mcts_tree[key].register_win(delta_wc)
 
-        legal_actions = list(state.get_legal_actions(self.play_as))
+        children = state.children(self.play_as)
 
-        if legal_actions == []:
+        if children == []:
             return None
         else:
-            next_states = [state.perform_action(
-                self.play_as, action) for action in legal_actions]
-            chosen_action, _ \
-                = max(zip(legal_actions, next_states),
-                      key=lambda x: self.mcts_tree[self.play_as, x[1]].win_rate)
+            chosen_action, _, _ \
+                = max(children,
+                      key=lambda x: self.mcts_tree[
+                          x[1].hash_key(self.play_as)].win_rate)
             return chosen_action
 
 
@@ -4,14 +4,11 @@ from typing import Optional
 import othello
 from log_referee import LogReferee
 import evaluation
+from search import SearchAgent
 
-class MinimaxAgent(othello.Agent):
-    def __init__(self, play_as: othello.Player, search_depth: int =2, eval_func=evaluation.heuristic_eval_comprehensive) -> None:
-        super().__init__()
-
-        self.play_as = play_as
-        self.depth = search_depth
-        self.evaluation_function = lambda state: eval_func(state, self.play_as)
+class MinimaxAgent(SearchAgent):
+    def __init__(self, play_as: othello.Player, search_depth: int =2, eval_func=evaluation.heuristic_eval_comprehensive, make_unmake: bool =False) -> None:
+        super().__init__(play_as, search_depth, eval_func, make_unmake)
 
     def play(self, state: othello.State) -> Optional[othello.Action]:
         legal_actions = list(state.get_legal_actions(self.play_as))
@@ -20,38 +17,35 @@ class MinimaxAgent(othello.Agent):
         else:
             def minimax(currentGameState, depth, player):
                 if currentGameState.is_terminal():
-                    return self.evaluation_function(currentGameState)
+                    return self.evaluate(currentGameState)
                 legal_actions = list(currentGameState.get_legal_actions(player))
 
                 scores = []
                 if player != self.play_as:
                     if depth == self.depth:
                         if len(legal_actions) == 0:
-                            return self.evaluation_function(currentGameState)
+                            return self.evaluate(currentGameState)
                         for action in legal_actions:
-                            childGameState = currentGameState.perform_action(player, action)
-                            scores.append(self.evaluation_function(currentGameState))
+                            scores.append(self.evaluate(currentGameState))
                         return min(scores)
                     else:
                         if len(legal_actions) == 0:
                             return minimax(currentGameState, depth + 1, player.adversary)
-                        for action in legal_actions:
-                            childGameState = currentGameState.perform_action(player, action)
-                            scores.append(minimax(childGameState, depth + 1, player.adversary))
+                        for action, child in self.successors(currentGameState, player):
+                            scores.append(self.search_child(currentGameState, player, action, child, minimax, depth + 1, player.adversary))
                         return min(scores)
                 else:
                     if len(legal_actions) == 0:
                         return minimax(currentGameState, depth, player.adversary)
-                    for action in legal_actions:
-                        childGameState = currentGameState.perform_action(player, action)
-                        scores.append(minimax(childGameState, depth, player.adversary))
+                    for action, child in self.successors(currentGameState, player):
+                        scores.append(self.search_child(currentGameState, player, action, child, minimax, depth, player.adversary))
                     return max(scores)    
 
             scores = []
             # Choose one of the best actions
-            for action in legal_actions:
-                childgameState = state.perform_action(self.play_as, action)
-                scores.append(minimax(childgameState, 1, self.play_as.adversary))
+            root = self.search_root(state)
+            for action, child in self.successors(root, self.play_as):
+                scores.append(self.search_child(root, self.play_as, action, child, minimax, 1, self.play_as.adversary))
             bestScore = max(scores)
             bestIndices = [index for index in range(len(scores)) if scores[index] == bestScore]
             # Pick randomly among the best
@@ -1,9 +1,14 @@
 from dataclasses import dataclass, field
 from enum import Enum, auto, unique
 import itertools
-from typing import Final, Iterable, Optional, Union
+import os
+import random
+import struct
+import sys
+from typing import Callable, Final, Iterable, Iterator, Optional, Union
 import time
-from functools import cache
+
+from lru import LRUCache
 
 @unique
 class Player(Enum):
@@ -28,12 +33,34 @@ class Coords:
           is given an index of 0, file b is given 2, etc.
     """
 
+    __slots__ = ('ix',)
+
     ix: int
 
+    def __new__(cls, ix: int) -> 'Coords':
+        # Valid coordinates are interned; __post_init__ rejects the rest.
+        if cls is Coords and type(ix) is int and 0 <= ix < 64:
+            try:
+                return _COORDS[ix]
+            except NameError:  # _COORDS is being built.
+                pass
+        return super().__new__(cls)
+
     def __post_init__(self):
         if not (0 <= self.ix < 64):
             raise ValueError('invalid ix')
 
+    def __reduce__(self):
+        return Coords.unchecked, (self.ix,)
+
+    @staticmethod
+    def unchecked(ix: int) -> 'Coords':
+        """Get the interned ``Coords`` of ix without validating it.
+
+        For trusted callers such as search code. ix must be in range(64).
+        """
+        return _COORDS[ix]
+
     @property
     def file(self) -> int:
         return self.ix & 0x7  # self.ix % 8
@@ -51,7 +78,7 @@ class Coords:
         if not (0 <= rank < 8):
             raise ValueError('invalid rank')
 
-        return Coords(rank*8 + file)
+        return _COORDS[rank*8 + file]
 
     @staticmethod
     def from_repr(string: str) -> 'Coords':
@@ -84,13 +111,42 @@ class Coords:
 class Action:
     """Action of an Othello game."""
 
+    __slots__ = ('coords',)
+
     coords: Coords
 
+    def __new__(cls, coords: Coords) -> 'Action':
+        # Actions at interned coordinates are interned.
+        if cls is Action and type(coords) is Coords:
+            try:
+                if _COORDS[coords.ix] is coords:
+                    return _ACTIONS[coords.ix]
+            except NameError:  # _ACTIONS is being built.
+                pass
+        return super().__new__(cls)
+
+    def __reduce__(self):
+        return Action.unchecked, (self.coords.ix,)
+
+    @staticmethod
+    def unchecked(ix: int) -> 'Action':
+        """Get the interned ``Action`` at square ix without validating it.
+
+        For trusted callers such as search code. ix must be in range(64).
+        """
+        return _ACTIONS[ix]
+
     @property
     def repr(self) -> str:
         return self.coords.repr
 
 
+# The 64 possible coordinates and actions are interned, so that search code
+# does not need to allocate them.
+_COORDS: Final[tuple[Coords, ...]] = tuple(Coords(ix) for ix in range(64))
+_ACTIONS: Final[tuple[Action, ...]] = tuple(Action(c) for c in _COORDS)
+
+
 @dataclass(frozen=True)
 class Board:
     """Board of an Othello game.
@@ -105,10 +161,12 @@ class Board:
     0 <= i < 64.
     """
 
+    __slots__ = ('dark_board', 'light_board', '_zobrist')
+
     dark_board: int
     light_board: int
 
-    def __postinit__(self):
+    def __post_init__(self):
         if not (0 <= self.dark_board <= 0xffffffffffffffff):
             raise ValueError('invalid dark_board')
 
@@ -119,6 +177,35 @@ class Board:
             raise ValueError('board in an inconsistent state: some squares are '
                              'played by both players')
 
+    def __reduce__(self):
+        return Board.unchecked, (self.dark_board, self.light_board)
+
+    @staticmethod
+    def unchecked(dark_board: int, light_board: int) -> 'Board':
+        """Create a ``Board`` without validating it.
+
+        For trusted callers such as search code, which derive boards from valid
+        boards only.
+        """
+        board = _new_object(Board)
+        _set_dark_board(board, dark_board)
+        _set_light_board(board, light_board)
+        return board
+
+    @property
+    def zobrist(self) -> int:
+        """64-bit Zobrist hash of the board.
+
+        Computed lazily, or derived incrementally from the hash of the parent
+        board by ``State.perform_action``.
+        """
+        try:
+            return self._zobrist
+        except AttributeError:
+            key = zobrist_hash(self.dark_board, self.light_board)
+            _set_board_zobrist(self, key)
+            return key
+
     def __getitem__(self, key: Coords) -> Optional[Player]:
         """Get the piece at a specified position."""
         mask = 0x1 << key.ix
@@ -177,6 +264,50 @@ class Board:
 
         return board
 
+    def transform(self, symmetry: 'Symmetry') -> 'Board':
+        """Transform the board by a symmetry."""
+        return Board.unchecked(symmetry.apply(self.dark_board),
+                               symmetry.apply(self.light_board))
+
+    def canonical(self) -> tuple['Board', 'Symmetry']:
+        """Get the canonical representative among the symmetric boards.
+
+        Returns the canonical board and the symmetry that transforms this board
+        into it. Boards related by a symmetry have the same canonical board, so
+        caches, opening books and databases can key on it to share entries.
+        Use the inverse of the symmetry to map e.g. actions back.
+        """
+        dark_board = self.dark_board
+        light_board = self.light_board
+
+        dark_v = flip_vertical(dark_board)
+        light_v = flip_vertical(light_board)
+        dark_d = flip_diagonal(dark_board)
+        light_d = flip_diagonal(light_board)
+        dark_vd = flip_vertical(dark_d)
+        light_vd = flip_vertical(light_d)
+        dark_dv = flip_diagonal(dark_v)
+        light_dv = flip_diagonal(light_v)
+        dark_h = flip_horizontal(dark_board)
+        light_h = flip_horizontal(light_board)
+        dark_hv = flip_vertical(dark_h)
+        light_hv = flip_vertical(light_h)
+        dark_a = flip_anti_diagonal(dark_board)
+        light_a = flip_anti_diagonal(light_board)
+
+        best = min(
+            (dark_board, light_board, Symmetry.IDENTITY),
+            (dark_vd, light_vd, Symmetry.ROTATE_90),
+            (dark_hv, light_hv, Symmetry.ROTATE_180),
+            (dark_dv, light_dv, Symmetry.ROTATE_270),
+            (dark_v, light_v, Symmetry.FLIP_VERTICAL),
+            (dark_h, light_h, Symmetry.FLIP_HORIZONTAL),
+            (dark_d, light_d, Symmetry.FLIP_DIAGONAL),
+            (dark_a, light_a, Symmetry.FLIP_ANTI_DIAGONAL),
+            key=lambda x: (x[0], x[1]))
+
+        return Board.unchecked(best[0], best[1]), best[2]
+
     @property
     def repr(self) -> Iterable[str]:
         """String representation of the board.
@@ -195,32 +326,387 @@ class Board:
                         for file in range(8)) for rank in range(8))
 
 
-class _DrawType:
-    pass
+# Slot setters, which bypass the frozen dataclass ``__setattr__``. Used by the
+# unchecked constructors.
+_new_object = object.__new__
+_set_dark_board = Board.__dict__['dark_board'].__set__
+_set_light_board = Board.__dict__['light_board'].__set__
+_set_board_zobrist = Board.__dict__['_zobrist'].__set__
 
 
-DRAW: Final[_DrawType] = _DrawType()
+_FULL: Final[int] = 0xffffffffffffffff
+_NOT_FILE_A: Final[int] = 0xfefefefefefefefe
+_NOT_FILE_H: Final[int] = 0x7f7f7f7f7f7f7f7f
 
+# Squares on the edges of the board, except the corners, and the corners.
+EDGE_MASK: Final[int] = 0x7e8181818181817e
+CORNER_MASK: Final[int] = 0x8100000000000081
 
-@dataclass(frozen=True)
-class State:
-    """State of an Othello game."""
+# Shift amounts of the 8 directions, paired with the masks that discard the
+# squares wrapped around the board edge after shifting left (towards h8) and
+# after shifting right (towards a1) respectively.
+_SHIFTS: Final[tuple[tuple[int, int, int], ...]] = (
+    (1, _NOT_FILE_A, _NOT_FILE_H),  # East / West.
+    (7, _NOT_FILE_H, _NOT_FILE_A),  # North-west / South-east.
+    (8, _FULL, _FULL),  # North / South.
+    (9, _NOT_FILE_A, _NOT_FILE_H),  # North-east / South-west.
+)
 
-    board: Board
 
-    @staticmethod
-    def initial() -> 'State':
-        """Return the initial state."""
-        return State(Board.initial())
+def bitboard_mobility(own: int, opp: int) -> int:
+    """Get bitmask of the squares where the player owning ``own`` can play.
 
-    @cache
-    def get_flips(self, player: Player, action: Action) -> int:
-        """Get bitmask of pieces flipped when player performs action."""
-        if self.board[action.coords] is not None:
+    Arguments:
+    - own: Bitboard of the pieces of the player to move.
+    - opp: Bitboard of the pieces of the adversary.
+
+    For each direction, the runs of adversary pieces adjacent to own pieces are
+    found with a Kogge-Stone occluded fill, which takes a fixed number of
+    shifts regardless of the board contents. The empty squares just beyond such
+    runs are legal moves.
+    """
+    empty = ~(own | opp) & _FULL
+    moves = 0x0
+
+    for s, lmask, rmask in _SHIFTS:
+        s2 = s << 1
+        s4 = s << 2
+
+        pro = opp & lmask
+        gen = own | (pro & (own << s))
+        pro &= pro << s
+        gen |= pro & (gen << s2)
+        pro &= pro << s2
+        gen |= pro & (gen << s4)
+        moves |= ((gen & opp) << s) & lmask & empty
+
+        pro = opp & rmask
+        gen = own | (pro & (own >> s))
+        pro &= pro >> s
+        gen |= pro & (gen >> s2)
+        pro &= pro >> s2
+        gen |= pro & (gen >> s4)
+        moves |= ((gen & opp) >> s) & rmask & empty
+
+    return moves
+
+
+if sys.version_info >= (3, 10):
+    popcount = int.bit_count
+else:
+    def popcount(mask: int) -> int:
+        """Count the set bits of mask."""
+        return bin(mask).count('1')
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Iterate over the indices of the set bits of mask, from LSB to MSB."""
+    while mask:
+        lsb = mask & -mask
+        yield lsb.bit_length() - 1
+        mask ^= lsb
+
+
+def flip_vertical(mask: int) -> int:
+    """Mirror a bitboard across the horizontal axis: (f, r) -> (f, 7-r)."""
+    return int.from_bytes(mask.to_bytes(8, 'little'), 'big')
+
+
+def flip_horizontal(mask: int) -> int:
+    """Mirror a bitboard across the vertical axis: (f, r) -> (7-f, r)."""
+    mask = ((mask >> 1) & 0x5555555555555555) \
+        | ((mask & 0x5555555555555555) << 1)
+    mask = ((mask >> 2) & 0x3333333333333333) \
+        | ((mask & 0x3333333333333333) << 2)
+    mask = ((mask >> 4) & 0x0f0f0f0f0f0f0f0f) \
+        | ((mask & 0x0f0f0f0f0f0f0f0f) << 4)
+    return mask
+
+
+def flip_diagonal(mask: int) -> int:
+    """Mirror a bitboard across the a1-h8 diagonal: (f, r) -> (r, f)."""
+    t = 0x0f0f0f0f00000000 & (mask ^ (mask << 28))
+    mask ^= t ^ (t >> 28)
+    t = 0x3333000033330000 & (mask ^ (mask << 14))
+    mask ^= t ^ (t >> 14)
+    t = 0x5500550055005500 & (mask ^ (mask << 7))
+    mask ^= t ^ (t >> 7)
+    return mask
+
+
+def flip_anti_diagonal(mask: int) -> int:
+    """Mirror a bitboard across the a8-h1 diagonal: (f, r) -> (7-r, 7-f)."""
+    t = mask ^ (mask << 36)
+    mask ^= 0xf0f0f0f00f0f0f0f & (t ^ (mask >> 36))
+    t = 0xcccc0000cccc0000 & (mask ^ (mask << 18))
+    mask ^= t ^ (t >> 18)
+    t = 0xaa00aa00aa00aa00 & (mask ^ (mask << 9))
+    mask ^= t ^ (t >> 9)
+    return mask
+
+
+@unique
+class Symmetry(Enum):
+    """Symmetry of the board, i.e. an element of the dihedral group D4.
+
+    The comment after each member shows where it maps the square (f, r), where
+    f and r are 0-based numeric indices of the file and the rank.
+    """
+
+    IDENTITY = auto()            # (f, r) -> (f, r)
+    ROTATE_90 = auto()           # (f, r) -> (r, 7-f)
+    ROTATE_180 = auto()          # (f, r) -> (7-f, 7-r)
+    ROTATE_270 = auto()          # (f, r) -> (7-r, f)
+    FLIP_VERTICAL = auto()       # (f, r) -> (f, 7-r)
+    FLIP_HORIZONTAL = auto()     # (f, r) -> (7-f, r)
+    FLIP_DIAGONAL = auto()       # (f, r) -> (r, f)
+    FLIP_ANTI_DIAGONAL = auto()  # (f, r) -> (7-r, 7-f)
+
+    def apply(self, mask: int) -> int:
+        """Transform a bitboard."""
+        return _SYMMETRY_FUNCTIONS[self](mask)
+
+    def apply_coords(self, coords: Coords) -> Coords:
+        """Transform coordinates."""
+        return _COORDS[self.apply(1 << coords.ix).bit_length() - 1]
+
+    @property
+    def inverse(self) -> 'Symmetry':
+        if self is Symmetry.ROTATE_90:
+            return Symmetry.ROTATE_270
+        elif self is Symmetry.ROTATE_270:
+            return Symmetry.ROTATE_90
+        else:  # The other symmetries are involutions.
+            return self
+
+
+_SYMMETRY_FUNCTIONS: Final[dict[Symmetry, Callable[[int], int]]] = {
+    Symmetry.IDENTITY: lambda mask: mask,
+    Symmetry.ROTATE_90: lambda mask: flip_vertical(flip_diagonal(mask)),
+    Symmetry.ROTATE_180:
+        lambda mask: flip_vertical(flip_horizontal(mask)),
+    Symmetry.ROTATE_270: lambda mask: flip_diagonal(flip_vertical(mask)),
+    Symmetry.FLIP_VERTICAL: flip_vertical,
+    Symmetry.FLIP_HORIZONTAL: flip_horizontal,
+    Symmetry.FLIP_DIAGONAL: flip_diagonal,
+    Symmetry.FLIP_ANTI_DIAGONAL: flip_anti_diagonal,
+}
+
+
+def _ray(ix: int, df: int, dr: int) -> int:
+    """Get bitmask of the squares from ix (exclusive) towards (df, dr)."""
+    file = (ix & 0x7) + df
+    rank = (ix >> 3) + dr
+
+    mask = 0x0
+    while 0 <= file < 8 and 0 <= rank < 8:
+        mask |= 1 << (rank*8 + file)
+        file += df
+        rank += dr
+
+    return mask
+
+
+# Rays from every square in the directions where the square index increases
+# (E, NW, N, NE) and where it decreases (W, SE, S, SW).
+_RAYS_UP: Final[tuple[tuple[int, ...], ...]] = tuple(
+    tuple(_ray(ix, df, dr) for df, dr in ((1, 0), (-1, 1), (0, 1), (1, 1)))
+    for ix in range(64))
+_RAYS_DOWN: Final[tuple[tuple[int, ...], ...]] = tuple(
+    tuple(_ray(ix, df, dr) for df, dr in ((-1, 0), (1, -1), (0, -1), (-1, -1)))
+    for ix in range(64))
+
+
+def bitboard_flips(own: int, opp: int, ix: int) -> int:
+    """Get bitmask of pieces flipped when the player owning ``own`` plays ix.
+
+    Arguments:
+    - own: Bitboard of the pieces of the player to move.
+    - opp: Bitboard of the pieces of the adversary.
+    - ix:  Integer representation of the coordinates of the move.
+
+    Along each ray from ix, the nearest square not holding an adversary piece
+    is isolated with bit arithmetic (the lowest set bit for rays going up, the
+    highest for rays going down). The adversary pieces before it are flipped
+    iff it holds an own piece.
+    """
+    if ((own | opp) >> ix) & 0x1:
+        return 0x0
+
+    flips = 0x0
+
+    for ray in _RAYS_UP[ix]:
+        blocker = ray & ~opp
+        first = blocker & -blocker
+        if first & own:
+            flips |= ray & (first - 1)
+
+    for ray in _RAYS_DOWN[ix]:
+        blocker = ray & ~opp
+        first = (1 << blocker.bit_length()) >> 1
+        if first & own:
+            flips |= ray & ~((first << 1) - 1)
+
+    return flips
+
+
+# The lines of the board along each of the 4 axes of _SHIFTS, i.e. rows (E-W),
+# anti-diagonals (NW-SE), columns (N-S) and diagonals (NE-SW).
+_LINES: Final[tuple[tuple[int, ...], ...]] = tuple(
+    tuple(sorted({_RAYS_UP[ix][k] | _RAYS_DOWN[ix][k] | (1 << ix)
+                  for ix in range(64)}))
+    for k in range(4))
+
+# Squares with a neighbour off the board along each of the 4 axes of _SHIFTS.
+_AXIS_BORDERS: Final[tuple[int, ...]] = (
+    0x8181818181818181, 0xff818181818181ff, 0xff000000000000ff,
+    0xff818181818181ff)
+
+
+def bitboard_stable(own: int, opp: int) -> int:
+    """Get bitmask of the pieces of own that can never be flipped.
+
+    A piece cannot be flipped along an axis if its line along that axis is
+    full, or if one of its two neighbours along the axis is off the board or is
+    itself a stable piece of own. Stable pieces are those that cannot be
+    flipped along any of the 4 axes, found by propagating from the pieces on
+    full lines and the board edges until nothing changes. The result is a
+    subset of the truly stable pieces.
+    """
+    occupied = own | opp
+
+    # Squares that cannot be flipped along each axis whatever the other pieces.
+    anchored = []
+    for lines, border in zip(_LINES, _AXIS_BORDERS):
+        full = 0x0
+        for line in lines:
+            if occupied & line == line:
+                full |= line
+        anchored.append(full | border)
+
+    stable = 0x0
+    while True:
+        new_stable = own
+        for (s, lmask, rmask), anchor in zip(_SHIFTS, anchored):
+            new_stable &= (anchor | ((stable << s) & lmask)
+                           | ((stable >> s) & rmask))
+
+        if new_stable == stable:
+            return stable
+        stable = new_stable
+
+
+def _zobrist_byte_tables(keys: list[int]) -> tuple[tuple[int, ...], ...]:
+    """Tabulate the XOR of keys over the set bits of every byte of a mask.
+
+    Entry [k][b] is the XOR of keys[8*k + i] over the set bits i of b.
+    """
+    tables = []
+
+    for k in range(8):
+        table = [0] * 256
+        for b in range(1, 256):
+            lsb = b & -b
+            table[b] = table[b ^ lsb] ^ keys[8*k + lsb.bit_length() - 1]
+        tables.append(tuple(table))
+
+    return tuple(tables)
+
+
+# Zobrist keys of a dark piece and a light piece on every square, and of light
+# being the player to move. They are drawn from a fixed seed, so that hashes
+# are the same in every process.
+_zobrist_rng = random.Random(0x07e110)
+ZOBRIST_DARK: Final[tuple[int, ...]] = tuple(
+    _zobrist_rng.getrandbits(64) for _ in range(64))
+ZOBRIST_LIGHT: Final[tuple[int, ...]] = tuple(
+    _zobrist_rng.getrandbits(64) for _ in range(64))
+ZOBRIST_LIGHT_TO_MOVE: Final[int] = _zobrist_rng.getrandbits(64)
+del _zobrist_rng
+
+_ZOBRIST_DARK_BYTES: Final = _zobrist_byte_tables(list(ZOBRIST_DARK))
+_ZOBRIST_LIGHT_BYTES: Final = _zobrist_byte_tables(list(ZOBRIST_LIGHT))
+_ZOBRIST_FLIP_BYTES: Final = _zobrist_byte_tables(
+    [d ^ l for d, l in zip(ZOBRIST_DARK, ZOBRIST_LIGHT)])
+
+
+def zobrist_hash(dark_board: int, light_board: int) -> int:
+    """Compute the Zobrist hash of a board from scratch."""
+    key = 0
+
+    for k in range(8):
+        key ^= _ZOBRIST_DARK_BYTES[k][dark_board & 0xff] \
+            ^ _ZOBRIST_LIGHT_BYTES[k][light_board & 0xff]
+        dark_board >>= 8
+        light_board >>= 8
+
+    return key
+
+
+def zobrist_move_delta(player: Player, ix: int, flips: int) -> int:
+    """Get the change of the Zobrist hash when player plays ix and flips flips.
+
+    XOR it into the hash of the board before the move to get the hash of the
+    board after the move, and vice versa.
+    """
+    delta = ZOBRIST_DARK[ix] if player is Player.DARK else ZOBRIST_LIGHT[ix]
+
+    for table in _ZOBRIST_FLIP_BYTES:
+        if flips == 0:
+            break
+        delta ^= table[flips & 0xff]
+        flips >>= 8
+
+    return delta
+
+
+# Cache of ``State.get_flips``. Its capacity (in entries) can be set by the
+# OTHELLO_FLIP_CACHE_SIZE environment variable or with ``FLIP_CACHE.resize``;
+# 0 disables caching. The referee clears it at the start of every game, and
+# long-running workers can call ``FLIP_CACHE.clear()`` between searches.
+FLIP_CACHE: Final[LRUCache[tuple[int, int, Player, int], int]] = LRUCache(
+    int(os.environ.get('OTHELLO_FLIP_CACHE_SIZE', 1 << 16)))
+
+
+class Backend:
+    """Base class for move-generation backends.
+
+    A backend computes mobility and flip masks from the bitboards of the player
+    to move (own) and of the adversary (opp). ``State``, ``SearchPosition`` and
+    every function built on them use the backend selected by ``set_backend``.
+    """
+
+    name = 'abstract'
+
+    def mobility(self, own: int, opp: int) -> int:
+        """Get bitmask of the squares where the player owning own can play."""
+        raise NotImplementedError('method not overridden')
+
+    def flips(self, own: int, opp: int, ix: int) -> int:
+        """Get bitmask of pieces flipped when the player owning own plays ix.
+        """
+        raise NotImplementedError('method not overridden')
+
+
+class ReferenceBackend(Backend):
+    """The original engine.
+
+    Flips are found by walking the 8 rays from the square one square at a time,
+    and mobility by computing the flips of all 64 squares. It is slow, and
+    meant as an oracle to check other backends against.
+    """
+
+    name = 'reference'
+
+    def mobility(self, own: int, opp: int) -> int:
+        return sum(1 << ix for ix in range(64) if self.flips(own, opp, ix))
+
+    def flips(self, own: int, opp: int, ix: int) -> int:
+        if ((own | opp) >> ix) & 0x1:
             return 0x0
 
-        file = action.coords.file
-        rank = action.coords.rank
+        file = ix & 0x7
+        rank = ix >> 3
 
         mask = 0x0
         for df, dr in ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1),
@@ -232,83 +718,437 @@ class State:
                 except ValueError:
                     break
 
-                if self.board[target_coords] is None:
-                    break
-                elif self.board[target_coords] is player:
+                target_mask = 1 << target_coords.ix
+
+                if own & target_mask:
                     mask = new_mask
                     break
-                else:  # self.board[target_coords] is player.adversary
-                    new_mask |= 1 << target_coords.ix
+                elif opp & target_mask:
+                    new_mask |= target_mask
+                else:  # The target square is empty.
+                    break
 
         return mask
 
+
+class BitboardBackend(Backend):
+    """Kogge-Stone mobility and ray-table flips. This is the default."""
+
+    name = 'bitboard'
+
+    mobility = staticmethod(bitboard_mobility)
+    flips = staticmethod(bitboard_flips)
+
+
+class DifferentialBackend(Backend):
+    """Runs two backends side by side and checks that they agree.
+
+    Results come from the first backend. A disagreement raises AssertionError.
+    The time spent in each backend is accumulated in ``elapsed``, keyed by
+    position ('first' or 'second', so that two backends of the same name are
+    told apart), and the number of calls of each kind in ``n_calls``.
+    """
+
+    def __init__(self, first: Backend, second: Backend) -> None:
+        self.first = first
+        self.second = second
+        self.name = f'{first.name}+{second.name}'
+        self.elapsed = {'first': 0., 'second': 0.}
+        self.n_calls = {'mobility': 0, 'flips': 0}
+
+    def _run(self, method: str, *args: int) -> int:
+        results = []
+
+        for position, backend in (('first', self.first),
+                                  ('second', self.second)):
+            start_time = time.perf_counter()
+            results.append(getattr(backend, method)(*args))
+            self.elapsed[position] += time.perf_counter() - start_time
+
+        self.n_calls[method] += 1
+
+        if results[0] != results[1]:
+            raise AssertionError(
+                f'backends disagree on {method}{args}: '
+                f'{self.first.name} gives {results[0]:#x}, '
+                f'{self.second.name} gives {results[1]:#x}')
+
+        return results[0]
+
+    def mobility(self, own: int, opp: int) -> int:
+        return self._run('mobility', own, opp)
+
+    def flips(self, own: int, opp: int, ix: int) -> int:
+        return self._run('flips', own, opp, ix)
+
+
+def _numpy_backend() -> Backend:
+    import batch_othello
+    return batch_othello.NumpyBackend()
+
+
+BACKENDS: Final[dict[str, Callable[[], Backend]]] = {
+    'reference': ReferenceBackend,
+    'bitboard': BitboardBackend,
+    'numpy': _numpy_backend,
+}
+
+
+def make_backend(name: str) -> Backend:
+    """Create a backend by name.
+
+    The name is a key of ``BACKENDS``, or two such keys joined by ``+`` for a
+    ``DifferentialBackend``, e.g. ``bitboard+reference``.
+    """
+    names = name.split('+')
+
+    try:
+        backends = [BACKENDS[n]() for n in names]
+    except KeyError:
+        raise ValueError(f'unknown backend: {name}')
+
+    if len(backends) == 1:
+        return backends[0]
+    elif len(backends) == 2:
+        return DifferentialBackend(*backends)
+    else:
+        raise ValueError(f'invalid backend: {name}')
+
+
+def set_backend(backend: Union[str, Backend]) -> None:
+    """Select the move-generation backend, by name or instance.
+
+    The initial backend is given by the OTHELLO_BACKEND environment variable,
+    and is ``bitboard`` by default. ``FLIP_CACHE`` is cleared, but the
+    mobility already cached in existing states is kept.
+    """
+    global _backend, _mobility, _flips
+
+    if isinstance(backend, str):
+        backend = make_backend(backend)
+
+    _backend = backend
+    _mobility = backend.mobility
+    _flips = backend.flips
+    FLIP_CACHE.clear()
+
+
+def get_backend() -> Backend:
+    """Get the move-generation backend in use."""
+    return _backend
+
+
+_backend: Backend = BitboardBackend()
+_mobility: Callable[[int, int], int] = bitboard_mobility
+_flips: Callable[[int, int, int], int] = bitboard_flips
+
+
+def differential_check(first: Backend, second: Backend, n_games: int = 100,
+                       seed: int = 0) -> DifferentialBackend:
+    """Play random games through two backends, checking that they agree.
+
+    At every position, the mobility of both players and the flips of both
+    players on all 64 squares are compared. Raises AssertionError on the first
+    disagreement. Returns the ``DifferentialBackend`` used, whose ``elapsed``
+    and ``n_calls`` give the throughput of each backend.
+    """
+    backend = DifferentialBackend(first, second)
+    rng = random.Random(seed)
+
+    for _ in range(n_games):
+        own = Board.initial().dark_board
+        opp = Board.initial().light_board
+
+        while True:
+            own_moves = backend.mobility(own, opp)
+            opp_moves = backend.mobility(opp, own)
+
+            for ix in range(64):
+                backend.flips(own, opp, ix)
+                backend.flips(opp, own, ix)
+
+            if own_moves != 0:
+                ix = rng.choice(list(iter_bits(own_moves)))
+                flips = backend.flips(own, opp, ix)
+                own |= (1 << ix) | flips
+                opp &= ~flips
+            elif opp_moves == 0:
+                break
+
+            own, opp = opp, own
+
+    return backend
+
+
+# Weights of the features of ``State.features`` in ``State.get_score``.
+SCORE_WEIGHTS: Final[tuple[int, ...]] = (2, 5, 10, 1, 1)
+
+# Binary layouts of ``State.to_bytes`` and ``Game.to_bytes``.
+_STATE_STRUCT: Final = struct.Struct('<QQ')
+_GAME_STRUCT: Final = struct.Struct('<QQB')
+
+
+class _DrawType:
+    pass
+
+
+DRAW: Final[_DrawType] = _DrawType()
+
+
+@dataclass(frozen=True)
+class State:
+    """State of an Othello game.
+
+    The mobility of each player is computed lazily, at most once per state, and
+    cached in the ``_dark_mobility`` and ``_light_mobility`` slots. Every query
+    about legal actions and the conclusion of the game is answered from it.
+    """
+
+    __slots__ = ('board', '_dark_mobility', '_light_mobility')
+
+    board: Board
+
+    def __reduce__(self):
+        return State.unchecked, (self.board,)
+
+    @staticmethod
+    def unchecked(board: Board) -> 'State':
+        """Create a ``State`` without validating it.
+
+        For trusted callers such as search code.
+        """
+        state = _new_object(State)
+        _set_state_board(state, board)
+        return state
+
+    @staticmethod
+    def initial() -> 'State':
+        """Return the initial state."""
+        return State(Board.initial())
+
+    def to_bytes(self) -> bytes:
+        """Serialise to 16 bytes.
+
+        The ``dark_board`` and ``light_board`` words follow each other, as
+        little-endian unsigned 64-bit integers.
+        """
+        return _STATE_STRUCT.pack(self.board.dark_board, self.board.light_board)
+
+    @staticmethod
+    def from_bytes(data: Union[bytes, bytearray, memoryview]) -> 'State':
+        """Deserialise a state serialised by ``to_bytes``."""
+        try:
+            dark_board, light_board = _STATE_STRUCT.unpack(data)
+        except struct.error:
+            raise ValueError('invalid serialised state')
+
+        return State(Board(dark_board, light_board))
+
+    def get_flips(self, player: Player, action: Action) -> int:
+        """Get bitmask of pieces flipped when player performs action.
+
+        Results are memoised in ``FLIP_CACHE``.
+        """
+        key = (self.board.dark_board, self.board.light_board, player,
+               action.coords.ix)
+        flips = FLIP_CACHE.get(key)
+
+        if flips is None:
+            if player is Player.DARK:
+                flips = _flips(self.board.dark_board, self.board.light_board,
+                               action.coords.ix)
+            else:  # player is Player.LIGHT
+                flips = _flips(self.board.light_board, self.board.dark_board,
+                               action.coords.ix)
+            FLIP_CACHE.put(key, flips)
+
+        return flips
+
+    def get_flips_reference(self, player: Player, action: Action) -> int:
+        """Reference implementation of ``get_flips``.
+
+        It uses ``ReferenceBackend`` whatever the selected backend is. It is
+        much slower than ``get_flips`` and only kept as an oracle for testing.
+        """
+        if player is Player.DARK:
+            return ReferenceBackend().flips(
+                self.board.dark_board, self.board.light_board, action.coords.ix)
+        else:  # player is Player.LIGHT
+            return ReferenceBackend().flips(
+                self.board.light_board, self.board.dark_board, action.coords.ix)
+
     def n_number(self, player: Player):
         if player is Player.DARK:
-            return f'{self.board.dark_board:b}'.count('1')
+            return popcount(self.board.dark_board)
         elif player is Player.LIGHT:
-            return f'{self.board.light_board:b}'.count('1')
+            return popcount(self.board.light_board)
 
     def n_edge(self, player: Player):
-        n_edge = 0
-        edge_point = []
-        for i in range(2, 8):
-            edge_point.append('a' + str(i))
-            edge_point.append('h' + str(i))
-        for char in range(ord('b'), ord('h')):
-            edge_point.append(chr(char) + '1')
-            edge_point.append(chr(char) + '8')
-        for point in edge_point:
-            if self.board[Coords.from_repr(point)] is player:
-                n_edge += 1
-        return n_edge
+        return popcount(self._own_board(player) & EDGE_MASK)
 
     def n_corner(self, player: Player):
-        n_corner = 0
-        for point in ['a1', 'a8', 'h1', 'h8']:
-            if self.board[Coords.from_repr(point)] is player:
-                n_corner += 1
-        return n_corner
+        return popcount(self._own_board(player) & CORNER_MASK)
 
     def n_action(self, player: Player):
-        return len(list(self.get_legal_actions(player)))
+        return popcount(self.mobility_mask(player))
 
     def adversary_n_action(self, player: Player):
-        return -len(list(self.get_legal_actions(player.adversary)))
+        return -popcount(self.mobility_mask(player.adversary))
+
+    def n_stable(self, player: Player) -> int:
+        """Get the number of pieces of player that can never be flipped.
+
+        See ``bitboard_stable``.
+        """
+        if player is Player.DARK:
+            return popcount(bitboard_stable(self.board.dark_board,
+                                            self.board.light_board))
+        else:  # player is Player.LIGHT
+            return popcount(bitboard_stable(self.board.light_board,
+                                            self.board.dark_board))
+
+    def disc_difference_bounds(self, player: Player) -> tuple[int, int]:
+        """Get bounds of the final disc difference of player.
+
+        Returns ``(lower, upper)`` such that, however the game continues, the
+        number of pieces of player minus the number of pieces of the adversary
+        at the end of the game lies between them. Stable pieces stay, so
+        endgame search can cut off a node whose bounds fall outside its window.
+        """
+        n_stable = self.n_stable(player)
+        n_adversary_stable = self.n_stable(player.adversary)
+        return 2 * n_stable - 64, 64 - 2 * n_adversary_stable
+
+    def features(self, player: Player) -> tuple[int, int, int, int, int]:
+        """Get the evaluation features of the state for player.
+
+        Returns ``(n_number, n_edge, n_corner, n_action, adversary_n_action)``,
+        the values of the methods of the same names, computed in one pass.
+        """
+        if player is Player.DARK:
+            own = self.board.dark_board
+            opp = self.board.light_board
+        else:  # player is Player.LIGHT
+            own = self.board.light_board
+            opp = self.board.dark_board
+
+        return (popcount(own), popcount(own & EDGE_MASK),
+                popcount(own & CORNER_MASK),
+                popcount(self.mobility_mask(player)),
+                -popcount(self.mobility_mask(player.adversary)))
 
     def get_score(self,player: Player):
-        score_number = self.n_number(player)
-        score_edge = self.n_edge(player)
-        score_corner = self.n_corner(player)
-        score_n_action = self.n_action(player)
-        score_adversary_n_action = self.adversary_n_action(player)
-        score = 2 * score_number + 5 * score_edge + 10 * score_corner + score_n_action + score_adversary_n_action
-        return score
+        number, edge, corner, n_action, adversary_n_action = \
+            self.features(player)
+        return (SCORE_WEIGHTS[0] * number + SCORE_WEIGHTS[1] * edge
+                + SCORE_WEIGHTS[2] * corner + SCORE_WEIGHTS[3] * n_action
+                + SCORE_WEIGHTS[4] * adversary_n_action)
+
+    def _own_board(self, player: Player) -> int:
+        if player is Player.DARK:
+            return self.board.dark_board
+        else:  # player is Player.LIGHT
+            return self.board.light_board
+
+    def hash_key(self, player: Player) -> int:
+        """64-bit Zobrist hash of the state with player to move.
+
+        Suitable as the key of search trees and transposition tables.
+        """
+        if player is Player.DARK:
+            return self.board.zobrist
+        else:  # player is Player.LIGHT
+            return self.board.zobrist ^ ZOBRIST_LIGHT_TO_MOVE
 
     def is_legal_action(self, player: Player, action: Action) -> bool:
         """Checks if some action is a legal actions for some player."""
-        return self.get_flips(player, action) > 0
+        return (self.mobility_mask(player) >> action.coords.ix) & 0x1 == 1
+
+    def mobility_mask(self, player: Player) -> int:
+        """Get bitmask of the squares where some player can play."""
+        if player is Player.DARK:
+            try:
+                return self._dark_mobility
+            except AttributeError:
+                mask = _mobility(self.board.dark_board,
+                                 self.board.light_board)
+                _set_dark_mobility(self, mask)
+                return mask
+        else:  # player is Player.LIGHT
+            try:
+                return self._light_mobility
+            except AttributeError:
+                mask = _mobility(self.board.light_board,
+                                 self.board.dark_board)
+                _set_light_mobility(self, mask)
+                return mask
 
     def get_legal_actions(self, player: Player) -> Iterable[Action]:
         """Return the legal actions by some player."""
-        return (action for action in (Action(Coords(i)) for i in range(64))
-                if self.is_legal_action(player, action))
+        return (_ACTIONS[i] for i in iter_bits(self.mobility_mask(player)))
 
     def perform_action(self, player: Player, action: Action):
         """Perform an action on behalf of some player."""
         if not self.is_legal_action(player, action):
             raise ValueError('illegal action')
 
-        mask = self.get_flips(player, action)
+        return self.perform_action_unchecked(player, action,
+                                             self.get_flips(player, action))
+
+    def perform_action_unchecked(self, player: Player, action: Action,
+                                 flips: int) -> 'State':
+        """Perform an action on behalf of some player, without checking it.
+
+        For trusted callers such as search code. flips must be the bitmask of
+        pieces flipped by the action, i.e. ``self.get_flips(player, action)``,
+        and must be non-zero.
+        """
+        ix = action.coords.ix
 
         if player is Player.DARK:
-            dark_board = self.board.dark_board | (1 << action.coords.ix) | mask
-            light_board = self.board.light_board & ~mask
+            dark_board = self.board.dark_board | (1 << ix) | flips
+            light_board = self.board.light_board & ~flips
         else:  # if player is Player.LIGHT
-            dark_board = self.board.dark_board & ~mask
-            light_board = \
-                self.board.light_board | (1 << action.coords.ix) | mask
+            dark_board = self.board.dark_board & ~flips
+            light_board = self.board.light_board | (1 << ix) | flips
 
-        return State(Board(dark_board, light_board))
+        board = Board.unchecked(dark_board, light_board)
+
+        # Only maintain the hash if it is in use, i.e. known for the parent.
+        try:
+            key = self.board._zobrist
+        except AttributeError:
+            pass
+        else:
+            _set_board_zobrist(board,
+                               key ^ zobrist_move_delta(player, ix, flips))
+
+        return State.unchecked(board)
+
+    def children(self, player: Player) -> list[tuple[Action, 'State', int]]:
+        """Get all successors of the state, for moves by some player.
+
+        Returns a list of ``(action, child state, flip mask)`` triples, one per
+        legal action, in the order of ``get_legal_actions``. This is cheaper
+        than calling ``perform_action`` on every legal action, since legality
+        is known from the mobility and every flip mask is computed once.
+        """
+        if player is Player.DARK:
+            own = self.board.dark_board
+            opp = self.board.light_board
+        else:  # player is Player.LIGHT
+            own = self.board.light_board
+            opp = self.board.dark_board
+
+        children = []
+        for ix in iter_bits(self.mobility_mask(player)):
+            action = _ACTIONS[ix]
+            flips = _flips(own, opp, ix)
+            children.append(
+                (action, self.perform_action_unchecked(player, action, flips),
+                 flips))
+
+        return children
 
     def get_conclusion(self) -> Optional[Union[Player, _DrawType]]:
         """Get the conclusion of the game.
@@ -318,9 +1158,8 @@ class State:
         - A player  if that player wins the game.
         - DRAW      if the game draws.
         """
-        no_legal_actions = all(False for _ in itertools.chain(
-            self.get_legal_actions(Player.DARK),
-            self.get_legal_actions(Player.LIGHT)))
+        no_legal_actions = self.mobility_mask(Player.DARK) == 0 \
+            and self.mobility_mask(Player.LIGHT) == 0
 
         if no_legal_actions:
             n_darks = self.n_number(Player.DARK)
@@ -345,6 +1184,162 @@ class State:
         return self.get_conclusion() is not None
 
 
+_set_state_board = State.__dict__['board'].__set__
+_set_dark_mobility = State.__dict__['_dark_mobility'].__set__
+_set_light_mobility = State.__dict__['_light_mobility'].__set__
+
+
+def pack_states(states: Iterable[State]) -> bytes:
+    """Serialise states to the concatenation of their ``to_bytes``."""
+    return b''.join(
+        _STATE_STRUCT.pack(s.board.dark_board, s.board.light_board)
+        for s in states)
+
+
+def unpack_states(data: Union[bytes, bytearray, memoryview]) -> list[State]:
+    """Deserialise states serialised by ``pack_states``.
+
+    Any buffer works, including a ``memoryview`` of part of a larger buffer.
+    """
+    data = memoryview(data).cast('B')
+
+    if len(data) % _STATE_STRUCT.size != 0:
+        raise ValueError('invalid serialised states')
+
+    states = []
+    for dark_board, light_board in _STATE_STRUCT.iter_unpack(data):
+        if dark_board & light_board:
+            raise ValueError('invalid serialised states')
+        states.append(State.unchecked(Board.unchecked(dark_board, light_board)))
+
+    return states
+
+
+class SearchPosition:
+    """Mutable game position for search algorithms.
+
+    Unlike ``State``, which is immutable, a search position is updated in place
+    with ``make`` and restored with ``unmake``, so that walking a search tree
+    allocates nothing but the undo tokens. Use the ``state`` property to get an
+    immutable snapshot, e.g. to pass to an evaluation function.
+
+    The Zobrist hash of the board (the ``zobrist`` attribute) is updated
+    incrementally. The mobility of each player is cached until the next
+    ``make`` or ``unmake``.
+
+    Trackers, such as ``evaluation.IncrementalEvaluation``, follow the position
+    up and down the tree: every ``make`` calls ``tracker.make(player, ix,
+    flips)`` and every ``unmake`` calls ``tracker.unmake()``.
+    """
+
+    __slots__ = ('dark_board', 'light_board', 'zobrist', 'trackers',
+                 '_dark_mobility', '_light_mobility')
+
+    def __init__(self, state: State, trackers: Iterable = ()) -> None:
+        self.dark_board = state.board.dark_board
+        self.light_board = state.board.light_board
+        self.zobrist = state.board.zobrist
+        self.trackers = tuple(trackers)
+        self._dark_mobility: Optional[int] = None
+        self._light_mobility: Optional[int] = None
+
+    @property
+    def state(self) -> State:
+        """Immutable snapshot of the position."""
+        return State.unchecked(Board.unchecked(self.dark_board,
+                                               self.light_board))
+
+    def mobility_mask(self, player: Player) -> int:
+        """Get bitmask of the squares where some player can play."""
+        if player is Player.DARK:
+            if self._dark_mobility is None:
+                self._dark_mobility = _mobility(self.dark_board,
+                                                self.light_board)
+            return self._dark_mobility
+        else:  # player is Player.LIGHT
+            if self._light_mobility is None:
+                self._light_mobility = _mobility(self.light_board,
+                                                 self.dark_board)
+            return self._light_mobility
+
+    def get_legal_actions(self, player: Player) -> Iterable[Action]:
+        """Return the legal actions by some player."""
+        return [_ACTIONS[i] for i in iter_bits(self.mobility_mask(player))]
+
+    def hash_key(self, player: Player) -> int:
+        """64-bit Zobrist hash of the position with player to move.
+
+        Equal to ``self.state.hash_key(player)``.
+        """
+        if player is Player.DARK:
+            return self.zobrist
+        else:  # player is Player.LIGHT
+            return self.zobrist ^ ZOBRIST_LIGHT_TO_MOVE
+
+    def make(self, player: Player, action: Action) -> tuple[int, int, int]:
+        """Perform an action on behalf of some player, in place.
+
+        Returns the undo token to pass to ``unmake``.
+        """
+        token = (self.dark_board, self.light_board, self.zobrist)
+        ix = action.coords.ix
+
+        if player is Player.DARK:
+            flips = _flips(self.dark_board, self.light_board, ix)
+            if flips == 0:
+                raise ValueError('illegal action')
+            self.dark_board |= (1 << ix) | flips
+            self.light_board &= ~flips
+        else:  # player is Player.LIGHT
+            flips = _flips(self.light_board, self.dark_board, ix)
+            if flips == 0:
+                raise ValueError('illegal action')
+            self.dark_board &= ~flips
+            self.light_board |= (1 << ix) | flips
+
+        self.zobrist ^= zobrist_move_delta(player, ix, flips)
+        self._dark_mobility = None
+        self._light_mobility = None
+
+        for tracker in self.trackers:
+            tracker.make(player, ix, flips)
+
+        return token
+
+    def unmake(self, token: tuple[int, int, int]) -> None:
+        """Undo the action whose ``make`` returned token.
+
+        Actions must be undone in the reverse order they were made.
+        """
+        self.dark_board, self.light_board, self.zobrist = token
+        self._dark_mobility = None
+        self._light_mobility = None
+
+        for tracker in self.trackers:
+            tracker.unmake()
+
+    def get_conclusion(self) -> Optional[Union[Player, _DrawType]]:
+        """Get the conclusion of the game. See ``State.get_conclusion``."""
+        if self.mobility_mask(Player.DARK) != 0 \
+                or self.mobility_mask(Player.LIGHT) != 0:
+            return None
+
+        n_darks = popcount(self.dark_board)
+        n_lights = popcount(self.light_board)
+
+        if n_darks > n_lights:
+            return Player.DARK
+        elif n_darks < n_lights:
+            return Player.LIGHT
+        else:
+            return DRAW
+
+    def is_terminal(self) -> bool:
+        """Check if the position is terminal."""
+        return self.mobility_mask(Player.DARK) == 0 \
+            and self.mobility_mask(Player.LIGHT) == 0
+
+
 @dataclass
 class Game:
     """An Othello game."""
@@ -357,7 +1352,7 @@ class Game:
         if player is not self.next_player:
             raise ValueError('not player\'s turn')
 
-        if any(True for _ in self.state.get_legal_actions(player)):
+        if self.state.mobility_mask(player) != 0:
             if action is None:
                 raise ValueError('cannot skip when there is an legal action')
             self.state = self.state.perform_action(player, action)
@@ -367,6 +1362,30 @@ class Game:
 
         self.next_player = self.next_player.adversary
 
+    def to_bytes(self) -> bytes:
+        """Serialise to 17 bytes.
+
+        The 16 bytes of ``State.to_bytes`` are followed by a byte holding the
+        next player: 0 for dark, 1 for light.
+        """
+        return _GAME_STRUCT.pack(self.state.board.dark_board,
+                                 self.state.board.light_board,
+                                 self.next_player is Player.LIGHT)
+
+    @staticmethod
+    def from_bytes(data: Union[bytes, bytearray, memoryview]) -> 'Game':
+        """Deserialise a game serialised by ``to_bytes``."""
+        try:
+            dark_board, light_board, next_player = _GAME_STRUCT.unpack(data)
+        except struct.error:
+            raise ValueError('invalid serialised game')
+
+        if next_player > 1:
+            raise ValueError('invalid serialised game')
+
+        return Game(State(Board(dark_board, light_board)),
+                    Player.LIGHT if next_player else Player.DARK)
+
     def get_score(self, player: Player):
         """Get the score of the player
         Return: score
@@ -425,6 +1444,8 @@ class Referee:
 
     def run(self):
         """Run the game."""
+        FLIP_CACHE.clear()
+
         while self.game.get_conclusion() is None:
             start_time = time.time()
             player = self.game.next_player
@@ -442,3 +1463,6 @@ class Referee:
             self.cb_post_move(player, action)
 
         self.cb_game_end()
+
+
+set_backend(os.environ.get('OTHELLO_BACKEND', 'bitboard'))
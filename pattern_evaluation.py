@@ -0,0 +1,318 @@
+"""Pattern-table evaluation.
+
+The board is covered by patterns: edges, corner regions, lines and diagonals.
+Each pattern occurs several times on the board, once per symmetry of the board
+that maps it to distinct squares, and all its instances share a table of
+weights indexed by the configuration of their squares. The configuration is
+read as a base-3 number whose k-th digit describes the k-th square of the
+instance: 0 if it is empty, 1 if it holds a piece of the player evaluated for,
+and 2 if it holds a piece of the adversary. The evaluation is the sum of the
+weights of all instances.
+
+Indices are gathered from the bitboards one rank at a time, with tables giving
+the base-3 contribution of every value of the byte of a rank.
+
+The weights of all patterns are stored one after another in a single
+1-dimensional ``.npy`` file, which is memory-mapped when loaded. Without a
+weight file, weights reproducing a classic table of square values are used.
+
+This module requires NumPy. ``PatternEvaluator`` instances, as well as
+``pattern_eval``, can be passed as the ``eval_func`` of the agents.
+"""
+
+import os
+from typing import Optional
+
+import numpy as np
+
+import evaluation
+import othello
+
+# Squares of each pattern, in the order of the digits of its index.
+PATTERNS: dict[str, tuple[str, ...]] = {
+    'edge_2x': ('a1', 'b1', 'c1', 'd1', 'e1', 'f1', 'g1', 'h1', 'b2', 'g2'),
+    'corner_3x3': ('a1', 'b1', 'c1', 'a2', 'b2', 'c2', 'a3', 'b3', 'c3'),
+    'corner_2x5': ('a1', 'b1', 'c1', 'd1', 'e1', 'a2', 'b2', 'c2', 'd2', 'e2'),
+    'line_2': ('a2', 'b2', 'c2', 'd2', 'e2', 'f2', 'g2', 'h2'),
+    'line_3': ('a3', 'b3', 'c3', 'd3', 'e3', 'f3', 'g3', 'h3'),
+    'line_4': ('a4', 'b4', 'c4', 'd4', 'e4', 'f4', 'g4', 'h4'),
+    'diagonal_8': ('a1', 'b2', 'c3', 'd4', 'e5', 'f6', 'g7', 'h8'),
+    'diagonal_7': ('a2', 'b3', 'c4', 'd5', 'e6', 'f7', 'g8'),
+    'diagonal_6': ('a3', 'b4', 'c5', 'd6', 'e7', 'f8'),
+    'diagonal_5': ('a4', 'b5', 'c6', 'd7', 'e8'),
+    'diagonal_4': ('a5', 'b6', 'c7', 'd8'),
+}
+
+# Values of the squares of a classic positional evaluation, from a1 to h8.
+SQUARE_VALUES: tuple[int, ...] = (
+    100, -20, 10,  5,  5, 10, -20, 100,
+    -20, -50, -2, -2, -2, -2, -50, -20,
+     10,  -2, -1, -1, -1, -1,  -2,  10,
+      5,  -2, -1, -1, -1, -1,  -2,   5,
+      5,  -2, -1, -1, -1, -1,  -2,   5,
+     10,  -2, -1, -1, -1, -1,  -2,  10,
+    -20, -50, -2, -2, -2, -2, -50, -20,
+    100, -20, 10,  5,  5, 10, -20, 100,
+)
+
+# Environment variable giving the path of the weight file.
+WEIGHTS_ENV = 'OTHELLO_PATTERN_WEIGHTS'
+
+DEFAULT_WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    'pattern_weights.npy')
+
+
+def _instances(squares: tuple[str, ...]) -> list[tuple[int, ...]]:
+    """Get the instances of a pattern, as tuples of square indices."""
+    coords = [othello.Coords.from_repr(sq) for sq in squares]
+    instances = []
+    seen = set()
+
+    for symmetry in othello.Symmetry:
+        instance = tuple(symmetry.apply_coords(c).ix for c in coords)
+        if frozenset(instance) not in seen:
+            seen.add(frozenset(instance))
+            instances.append(instance)
+
+    return instances
+
+
+INSTANCES: dict[str, list[tuple[int, ...]]] = {
+    name: _instances(squares) for name, squares in PATTERNS.items()}
+
+# Offset of the weights of each pattern in the weight array.
+OFFSETS: dict[str, int] = {}
+N_WEIGHTS = 0
+for _name, _squares in PATTERNS.items():
+    OFFSETS[_name] = N_WEIGHTS
+    N_WEIGHTS += 3 ** len(_squares)
+del _name, _squares
+
+
+def _gather_tables(instance: tuple[int, ...], offset: int) \
+        -> tuple[int, tuple[tuple[int, tuple[int, ...]], ...]]:
+    """Get the bit-gather tables of a pattern instance.
+
+    Returns the offset and, for each rank covering the instance, the pair of
+    the rank and the table mapping the byte of the rank to the sum of the
+    powers of 3 of the squares in it.
+    """
+    tables = []
+
+    for rank in range(8):
+        digits = [(ix & 0x7, 3 ** k) for k, ix in enumerate(instance)
+                  if ix >> 3 == rank]
+        if digits:
+            table = tuple(sum(power for file, power in digits
+                              if (byte >> file) & 0x1)
+                          for byte in range(256))
+            tables.append((rank, table))
+
+    return offset, tuple(tables)
+
+
+_GATHER_TABLES = tuple(_gather_tables(instance, OFFSETS[name])
+                       for name, instances in INSTANCES.items()
+                       for instance in instances)
+
+
+def pattern_indices(own: int, opp: int) -> list[int]:
+    """Get the indices in the weight array of every pattern instance.
+
+    own and opp are the bitboards of the player evaluated for and of the
+    adversary.
+    """
+    own_bytes = own.to_bytes(8, 'little')
+    opp_bytes = opp.to_bytes(8, 'little')
+
+    indices = []
+    for offset, tables in _GATHER_TABLES:
+        index = offset
+        for rank, table in tables:
+            index += table[own_bytes[rank]] + 2 * table[opp_bytes[rank]]
+        indices.append(index)
+
+    return indices
+
+
+# Offset in the weight array of every pattern instance, and power of 3 of every
+# square in every instance, 0 if the instance does not cover the square. Both
+# are in the order of pattern_indices.
+_INSTANCE_OFFSETS = np.array([offset for offset, _ in _GATHER_TABLES],
+                             dtype=np.int64)
+_SQUARE_POWERS = np.zeros((64, len(_GATHER_TABLES)), dtype=np.int64)
+for _i, _instance in enumerate(instance for instances in INSTANCES.values()
+                               for instance in instances):
+    for _k, _ix in enumerate(_instance):
+        _SQUARE_POWERS[_ix, _i] = 3 ** _k
+del _i, _instance, _k, _ix
+
+
+def pattern_indices_batch(own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    """Vectorised ``pattern_indices``.
+
+    Returns an array with a trailing axis of the indices of the instances.
+    """
+    squares = np.arange(64, dtype=np.uint64)
+    own_bits = ((own[..., np.newaxis] >> squares) & np.uint64(1)) \
+        .astype(np.int64)
+    opp_bits = ((opp[..., np.newaxis] >> squares) & np.uint64(1)) \
+        .astype(np.int64)
+    return _INSTANCE_OFFSETS + (own_bits + 2 * opp_bits) @ _SQUARE_POWERS
+
+
+def bootstrap_weights() -> np.ndarray:
+    """Get weights under which the evaluation is the positional evaluation.
+
+    The value of each square is split evenly among the instances covering it,
+    so that the evaluation of a board is the sum of ``SQUARE_VALUES`` over the
+    squares of the player, minus the sum over the squares of the adversary.
+    """
+    cover = [0] * 64
+    for instances in INSTANCES.values():
+        for instance in instances:
+            for ix in instance:
+                cover[ix] += 1
+
+    weights = np.zeros(N_WEIGHTS, dtype=np.float32)
+    for name, instances in INSTANCES.items():
+        squares = instances[0]
+        values = np.array([SQUARE_VALUES[ix] / cover[ix] for ix in squares])
+
+        # digits[i, k] is the k-th base-3 digit of i.
+        indices = np.arange(3 ** len(squares))
+        digits = indices[:, np.newaxis] // 3 ** np.arange(len(squares)) % 3
+        signs = np.select([digits == 1, digits == 2], [1., -1.], 0.)
+        weights[OFFSETS[name]:OFFSETS[name] + len(indices)] = signs @ values
+
+    return weights
+
+
+def load_weights(path: str) -> np.ndarray:
+    """Load weights from a ``.npy`` file, memory-mapped read-only."""
+    weights = np.load(path, mmap_mode='r')
+
+    if weights.shape != (N_WEIGHTS,):
+        raise ValueError(f'invalid pattern weights: expected shape '
+                         f'({N_WEIGHTS},), got {weights.shape}')
+
+    return weights
+
+
+def save_weights(weights: np.ndarray, path: str) -> None:
+    """Save weights to a ``.npy`` file."""
+    weights = np.asarray(weights, dtype=np.float32)
+
+    if weights.shape != (N_WEIGHTS,):
+        raise ValueError(f'invalid pattern weights: expected shape '
+                         f'({N_WEIGHTS},), got {weights.shape}')
+
+    np.save(path, weights)
+
+
+class PatternEvaluator:
+    """Evaluation function summing pattern weights.
+
+    Instances are called as ``evaluator(state, player)``, like the functions of
+    the ``evaluation`` module.
+    """
+
+    def __init__(self, weights: Optional[np.ndarray] = None) -> None:
+        self.weights = bootstrap_weights() if weights is None else weights
+
+    @staticmethod
+    def from_file(path: Optional[str] = None) -> 'PatternEvaluator':
+        """Create an evaluator with weights loaded from a file.
+
+        The path defaults to the value of the OTHELLO_PATTERN_WEIGHTS
+        environment variable, then to ``pattern_weights.npy`` next to this
+        module. Bootstrap weights are used if there is no file at the default
+        path.
+        """
+        if path is None:
+            path = os.environ.get(WEIGHTS_ENV)
+
+            if path is None:
+                if not os.path.exists(DEFAULT_WEIGHTS_PATH):
+                    return PatternEvaluator()
+                path = DEFAULT_WEIGHTS_PATH
+
+        return PatternEvaluator(load_weights(path))
+
+    def __call__(self, state: othello.State, player: othello.Player) -> float:
+        if player is othello.Player.DARK:
+            own = state.board.dark_board
+            opp = state.board.light_board
+        else:  # player is othello.Player.LIGHT
+            own = state.board.light_board
+            opp = state.board.dark_board
+
+        return float(self.weights[pattern_indices(own, opp)].sum())
+
+    def evaluate_batch(self, dark: np.ndarray, light: np.ndarray,
+                       player: othello.Player) -> np.ndarray:
+        """Evaluate the boards of the arrays dark and light for player.
+
+        See ``evaluation.evaluate_batch``.
+        """
+        if player is othello.Player.DARK:
+            indices = pattern_indices_batch(dark, light)
+        else:  # player is othello.Player.LIGHT
+            indices = pattern_indices_batch(light, dark)
+
+        return self.weights[indices].sum(axis=-1)
+
+    def incremental(self, state: othello.State) \
+            -> 'IncrementalPatternEvaluation':
+        """Get the incremental counterpart of the evaluator, starting at state.
+        """
+        return IncrementalPatternEvaluation(self.weights, state)
+
+
+class IncrementalPatternEvaluation(evaluation.IncrementalEvaluation):
+    """Incremental ``PatternEvaluator``.
+
+    The indices of all instances, for dark and for light, are updated from the
+    placed piece and the flip mask of every move, so that ``evaluate`` only
+    sums the weights. The scores are those of ``PatternEvaluator``.
+    """
+
+    def __init__(self, weights: np.ndarray, state: othello.State) -> None:
+        self.weights = weights
+        dark = state.board.dark_board
+        light = state.board.light_board
+        self.dark_indices = np.array(pattern_indices(dark, light))
+        self.light_indices = np.array(pattern_indices(light, dark))
+        self.history = []
+
+    def make(self, player: othello.Player, ix: int, flips: int) -> None:
+        placed = _SQUARE_POWERS[ix]
+        flipped = _SQUARE_POWERS[list(othello.iter_bits(flips))].sum(axis=0)
+
+        # The digit of the placed piece goes from 0 to 1 for the player and to
+        # 2 for the adversary. Those of the flipped pieces go from 2 to 1 for
+        # the player and from 1 to 2 for the adversary.
+        own_delta = placed - flipped
+        opp_delta = 2 * placed + flipped
+
+        self.history.append((self.dark_indices, self.light_indices))
+
+        if player is othello.Player.DARK:
+            self.dark_indices = self.dark_indices + own_delta
+            self.light_indices = self.light_indices + opp_delta
+        else:  # player is othello.Player.LIGHT
+            self.dark_indices = self.dark_indices + opp_delta
+            self.light_indices = self.light_indices + own_delta
+
+    def unmake(self) -> None:
+        self.dark_indices, self.light_indices = self.history.pop()
+
+    def evaluate(self, position: othello.SearchPosition,
+                 player: othello.Player) -> float:
+        if player is othello.Player.DARK:
+            return float(self.weights[self.dark_indices].sum())
+        else:  # player is othello.Player.LIGHT
+            return float(self.weights[self.light_indices].sum())
+
+
+pattern_eval = PatternEvaluator.from_file()
@@ -0,0 +1,117 @@
+"""Perft: count the leaf positions of the game tree to a fixed depth.
+
+Usage: python3 perft.py [-j JOBS] DEPTH [BOARD_FILE]
+
+The count from the initial position (or the board read from BOARD_FILE, in the
+format of ``othello.Board.from_repr``, with dark to move) is checked against the
+known Othello perft counts when those apply, and reported with the number of
+nodes per second. Use -j to split the root moves across worker processes.
+
+A pass counts as a move. A position where the game ends before the requested
+depth is counted as a single leaf.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import sys
+import time
+from typing import Optional
+
+import othello
+
+# Perft counts from the initial position, indexed by depth.
+KNOWN_COUNTS: tuple[int, ...] = (
+    1, 4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288, 24571284,
+    212258800, 1939886636, 18429641748, 184042084512)
+
+
+def perft(state: othello.State, player: othello.Player, depth: int) -> int:
+    """Count the leaf positions at depth plies from state, player to move."""
+    if depth == 0:
+        return 1
+
+    moves = state.mobility_mask(player)
+
+    if moves == 0:
+        if state.mobility_mask(player.adversary) == 0:
+            return 1  # The game has ended.
+        return perft(state, player.adversary, depth - 1)  # Pass.
+
+    if depth == 1:
+        return othello.popcount(moves)
+
+    return sum(perft(state.perform_action(player, othello.Action.unchecked(ix)),
+                     player.adversary, depth - 1)
+               for ix in othello.iter_bits(moves))
+
+
+def _perft_args(args: tuple[bytes, int]) -> int:
+    game = othello.Game.from_bytes(args[0])
+    return perft(game.state, game.next_player, args[1])
+
+
+def parallel_perft(state: othello.State, player: othello.Player, depth: int,
+                   jobs: int) -> int:
+    """Run perft, splitting the root moves across jobs worker processes."""
+    moves = state.mobility_mask(player)
+
+    if depth <= 1 or moves == 0:
+        return perft(state, player, depth)
+
+    # Positions are sent to the workers in the binary format of othello.Game.
+    tasks = []
+    for ix in othello.iter_bits(moves):
+        child = state.perform_action(player, othello.Action.unchecked(ix))
+        tasks.append((othello.Game(child, player.adversary).to_bytes(),
+                      depth - 1))
+
+    with ProcessPoolExecutor(jobs) as executor:
+        return sum(executor.map(_perft_args, tasks))
+
+
+def run_perft(depth: int, board: Optional[othello.Board] = None,
+              jobs: int = 1) -> bool:
+    """Run perft and report the result. Returns False on a wrong count."""
+    from_initial = board is None or board == othello.Board.initial()
+    state = othello.State.initial() if board is None else othello.State(board)
+
+    start_time = time.perf_counter()
+    if jobs > 1:
+        count = parallel_perft(state, othello.Player.DARK, depth, jobs)
+    else:
+        count = perft(state, othello.Player.DARK, depth)
+    elapsed = time.perf_counter() - start_time
+
+    print(f'perft({depth}) = {count}')
+    print(f'{elapsed:.3f} s, {count / elapsed:.0f} nodes/s')
+
+    if from_initial and depth < len(KNOWN_COUNTS):
+        if count != KNOWN_COUNTS[depth]:
+            print(f'WRONG: expected {KNOWN_COUNTS[depth]}')
+            return False
+        print('OK')
+
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Othello perft.')
+    parser.add_argument('depth', type=int)
+    parser.add_argument('board_file', nargs='?',
+                        help='file holding the board in the format of '
+                             'othello.Board.from_repr (default: initial)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='number of worker processes')
+    args = parser.parse_args()
+
+    board = None
+    if args.board_file is not None:
+        with open(args.board_file) as f:
+            board = othello.Board.from_repr(
+                line.strip() for line in f if line.strip())
+
+    sys.exit(0 if run_perft(args.depth, board, args.jobs) else 1)
+
+
+if __name__ == '__main__':
+    main()
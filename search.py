@@ -0,0 +1,75 @@
+"""Base class of the game-tree search agents."""
+
+from typing import Optional
+
+import evaluation
+import othello
+
+
+class SearchAgent(othello.Agent):
+    """Agent searching the game tree with an evaluation function.
+
+    Search code walks the tree through ``search_root``, ``successors``,
+    ``search_child`` and ``evaluate``, so that it runs unchanged on either
+    kind of node. With make_unmake, the search runs on a mutable
+    othello.SearchPosition instead of allocating a new othello.State per node.
+    The results are the same. The evaluation is updated incrementally if
+    eval_func supports it.
+    """
+
+    def __init__(self, play_as: othello.Player, search_depth: int,
+                 eval_func, make_unmake: bool = False) -> None:
+        super().__init__()
+
+        self.play_as = play_as
+        self.depth = search_depth
+        self.eval_func = eval_func
+        self.evaluation_function = lambda state: eval_func(state, self.play_as)
+        self.make_unmake = make_unmake
+        self.incremental = None
+
+    def search_root(self, state: othello.State):
+        """Get the root node of the search from state."""
+        if self.make_unmake:
+            self.incremental = evaluation.incremental(self.eval_func, state)
+            if self.incremental is not None:
+                return othello.SearchPosition(state, [self.incremental])
+            return othello.SearchPosition(state)
+        return state
+
+    def evaluate(self, node) -> float:
+        """Evaluate an othello.State or othello.SearchPosition."""
+        if self.make_unmake:
+            if self.incremental is not None:
+                return self.incremental.evaluate(node, self.play_as)
+            return self.evaluation_function(node.state)
+        return self.evaluation_function(node)
+
+    def successors(self, node, player: othello.Player) \
+            -> list[tuple[othello.Action, Optional[othello.State]]]:
+        """Get the (action, child) pairs of node for moves by player.
+
+        The child is None when searching on an othello.SearchPosition. Pass
+        both to search_child.
+        """
+        if self.make_unmake:
+            return [(action, None)
+                    for action in node.get_legal_actions(player)]
+        return [(action, child) for action, child, _ in node.children(player)]
+
+    def search_child(self, node, player: othello.Player,
+                     action: othello.Action, child: Optional[othello.State],
+                     search, *args) -> float:
+        """Call search on the child of node reached when player plays action.
+
+        The child is passed as the first argument of search, followed by args.
+        The position is restored even if search raises, e.g. when a search is
+        aborted.
+        """
+        if self.make_unmake:
+            undo = node.make(player, action)
+            try:
+                return search(node, *args)
+            finally:
+                node.unmake(undo)
+        return search(child, *args)
@@ -0,0 +1,284 @@
+import unittest
+from unittest import mock
+
+import othello
+from alpha_beta_agent import AlphaBetaAgent
+from test_othello_bitboard import random_states
+from transposition import Bound
+
+
+def full_window_value(state, player, depth, play_as, eval_func, alpha=float('-inf'), beta=float('inf')):
+    """Value of state searched depth plies deep, as AlphaBetaAgent scores it.
+
+    Plain alpha-beta with no transposition table: exact from a full window.
+    """
+    if state.is_terminal() or depth == 0:
+        return eval_func(state, play_as)
+    children = [child for _, child, _ in state.children(player)]
+    if children == []:
+        return full_window_value(state, player.adversary, depth - 1, play_as, eval_func, alpha, beta)
+    if player == play_as:
+        v = float('-inf')
+        for child in children:
+            v = max(v, full_window_value(child, player.adversary, depth - 1, play_as, eval_func, alpha, beta))
+            alpha = max(alpha, v)
+            if v > beta:
+                break
+    else:
+        v = float('inf')
+        for child in children:
+            v = min(v, full_window_value(child, player.adversary, depth - 1, play_as, eval_func, alpha, beta))
+            beta = min(beta, v)
+            if v < alpha:
+                break
+    return v
+
+
+class FakeClock:
+    """Stand-in for time.perf_counter, advancing by tick at every reading."""
+
+    def __init__(self, tick):
+        self.tick = tick
+        self.now = 0.
+
+    def __call__(self):
+        self.now += self.tick
+        return self.now
+
+
+class TestAnytime(unittest.TestCase):
+    def setUp(self):
+        self.samples = list(random_states(1, 0))[8:48:8]
+
+    def test_node_budget(self):
+        for make_unmake in (False, True):
+            for state, player in self.samples:
+                agent = AlphaBetaAgent(player, node_budget=300,
+                                       make_unmake=make_unmake)
+                action = agent.play(state)
+
+                self.assertTrue(state.is_legal_action(player, action))
+                self.assertGreaterEqual(agent.completed_plies, 1)
+                # The first iteration may exceed the budget, which is then
+                # exhausted as soon as a node is searched.
+                if agent.completed_plies > 1:
+                    self.assertLessEqual(agent.n_nodes, 301)
+
+    def test_time_budget(self):
+        state, player = self.samples[2]
+        agent = AlphaBetaAgent(player, time_budget=.1)
+        clock = FakeClock(.001)
+
+        with mock.patch('time.perf_counter', clock):
+            action = agent.play(state)
+
+        self.assertTrue(state.is_legal_action(player, action))
+        self.assertGreater(agent.completed_plies, 1)
+        # The clock is read every 64 nodes, once per tick: the search stops at
+        # the first reading past the deadline.
+        self.assertGreater(clock.now, .1)
+        self.assertLess(clock.now, .1 + 2 * clock.tick)
+        self.assertLess(agent.n_nodes, 64 * (.1 / clock.tick + 2))
+
+    def test_deeper_with_more_budget(self):
+        state, player = self.samples[1]
+        small = AlphaBetaAgent(player, node_budget=100)
+        large = AlphaBetaAgent(player, node_budget=5000)
+        small.play(state)
+        large.play(state)
+
+        self.assertLess(small.completed_plies, large.completed_plies)
+
+    def test_endgame(self):
+        states = [(state, player) for state, player in random_states(1, 1)
+                  if othello.popcount(state.board.dark_board
+                                      | state.board.light_board) == 60]
+        state, player = states[0]
+        agent = AlphaBetaAgent(player, time_budget=10.)
+
+        # With the clock stopped the budget never runs out: the search stops
+        # because it reaches the end of the game, 4 empty squares away.
+        with mock.patch('time.perf_counter', FakeClock(0.)):
+            agent.play(state)
+
+        self.assertLessEqual(agent.completed_plies, 8)
+
+    def test_fixed_depth(self):
+        state, player = self.samples[0]
+        agent = AlphaBetaAgent(player, 2)
+        agent.play(state)
+
+        self.assertEqual(agent.completed_plies, 4)
+
+
+class TestMoveOrdering(unittest.TestCase):
+    def setUp(self):
+        self.samples = list(random_states(1, 0))[8:48:8]
+
+    def test_same_moves(self):
+        for make_unmake in (False, True):
+            for state, player in self.samples:
+                unordered = AlphaBetaAgent(player, 2, make_unmake=make_unmake,
+                                           move_ordering=False)
+                ordered = AlphaBetaAgent(player, 2, make_unmake=make_unmake)
+
+                self.assertIs(ordered.play(state), unordered.play(state))
+
+    def test_fewer_nodes(self):
+        n_nodes = {}
+        rates = {}
+        for move_ordering in (False, True):
+            n_nodes[move_ordering] = 0
+            agent = None
+            for state, player in self.samples:
+                agent = AlphaBetaAgent(player, 2, tt_size=0,
+                                       move_ordering=move_ordering)
+                agent.play(state)
+                n_nodes[move_ordering] += agent.n_nodes
+                self.assertGreater(agent.n_cutoffs, 0)
+            rates[move_ordering] = agent.first_move_cutoff_rate
+
+        self.assertLess(n_nodes[True], n_nodes[False])
+        self.assertGreaterEqual(rates[True], rates[False])
+        self.assertLessEqual(rates[True], 1)
+
+    def test_same_order_make_unmake(self):
+        for state, player in self.samples:
+            agent = AlphaBetaAgent(player, 2)
+            agent.play(state)
+
+            for mover in othello.Player:
+                for ply in (1, 2):
+                    orders = []
+                    for make_unmake in (False, True):
+                        agent.make_unmake = make_unmake
+                        node = agent.search_root(state)
+                        moves = agent.successors(node, mover)
+                        orders.append([action for action, _ in agent.order_moves(node, mover, moves, None, ply)])
+                        if make_unmake:
+                            self.assertEqual(node.state, state)
+
+                    self.assertEqual(orders[0], orders[1])
+
+    def test_deep_search(self):
+        # Fixed-depth searches may go deeper than the anytime mode.
+        states = [(state, player) for state, player in random_states(1, 1)
+                  if othello.popcount(state.board.dark_board
+                                      | state.board.light_board) == 58]
+        state, player = states[0]
+        agent = AlphaBetaAgent(player, 33)
+        action = agent.play(state)
+
+        self.assertTrue(state.is_legal_action(player, action))
+        self.assertEqual(len(agent.killers), 67)
+        # Any ply of the search has killers.
+        agent.record_cutoff(player, action, 0, 1, 65)
+        self.assertIs(agent.killers[65][0], action)
+
+    def test_killers_and_history(self):
+        state, player = self.samples[1]
+        agent = AlphaBetaAgent(player, 2)
+        agent.play(state)
+
+        self.assertTrue(any(killers[0] is not None
+                            for killers in agent.killers))
+        self.assertGreater(sum(agent.history[othello.Player.DARK])
+                           + sum(agent.history[othello.Player.LIGHT]), 0)
+
+
+class TestSearches(unittest.TestCase):
+    def setUp(self):
+        self.samples = list(random_states(1, 0))[8:48:8]
+
+    def test_same_scores(self):
+        for make_unmake in (False, True):
+            for state, player in self.samples:
+                reference = AlphaBetaAgent(player, 2, make_unmake=make_unmake,
+                                           tt_size=0)
+                action = reference.play(state)
+
+                for search in ('pvs', 'mtdf'):
+                    agent = AlphaBetaAgent(player, 2, make_unmake=make_unmake,
+                                           search=search)
+                    chosen = agent.play(state)
+
+                    self.assertEqual(agent.score, reference.score)
+                    self.assertTrue(state.is_legal_action(player, chosen))
+                    if search == 'pvs':
+                        self.assertIs(chosen, action)
+
+    def test_fewer_nodes(self):
+        # The null windows pay off from depth 3 on.
+        n_nodes = {}
+        for search in AlphaBetaAgent.SEARCHES:
+            n_nodes[search] = 0
+            for state, player in self.samples[:2]:
+                agent = AlphaBetaAgent(player, 3, search=search)
+                agent.play(state)
+                n_nodes[search] += agent.n_nodes
+
+        self.assertLess(n_nodes['pvs'], n_nodes['alphabeta'])
+        self.assertLess(n_nodes['mtdf'], n_nodes['alphabeta'])
+
+    def test_anytime(self):
+        for search in ('pvs', 'mtdf'):
+            for state, player in self.samples:
+                agent = AlphaBetaAgent(player, node_budget=300, search=search)
+                action = agent.play(state)
+
+                self.assertTrue(state.is_legal_action(player, action))
+                self.assertGreaterEqual(agent.completed_plies, 1)
+
+    def assert_consistent_table(self, agent, positions, values):
+        """Check every entry of the table of agent against its true value."""
+        for entry in agent.tt._slots:
+            if entry is None:
+                continue
+            key = (entry.key, entry.depth, agent.play_as)
+            if key not in values:
+                state, player = positions[entry.key]
+                values[key] = full_window_value(state, player, entry.depth, agent.play_as, agent.eval_func)
+            value = values[key]
+
+            if entry.bound is Bound.EXACT:
+                self.assertEqual(entry.score, value)
+            elif entry.bound is Bound.LOWER:
+                self.assertGreaterEqual(value, entry.score)
+            else:  # entry.bound is Bound.UPPER
+                self.assertLessEqual(value, entry.score)
+
+    def test_consistent_table(self):
+        # Positions by key, recorded as the agents hash them, and their true
+        # values by (key, depth, play_as).
+        positions = {}
+        values = {}
+        hash_key = othello.State.hash_key
+
+        def recording_hash_key(state, player):
+            key = hash_key(state, player)
+            positions[key] = (state, player)
+            return key
+
+        with mock.patch.object(othello.State, 'hash_key', recording_hash_key):
+            for search in AlphaBetaAgent.SEARCHES:
+                state, player = self.samples[0]
+                agent = AlphaBetaAgent(player, 3, search=search)
+                agent.play(state)
+                with self.subTest(search=search, anytime=False):
+                    self.assert_consistent_table(agent, positions, values)
+
+                # Iterative deepening stores entries of many depths and
+                # windows.
+                for state, player in self.samples:
+                    agent = AlphaBetaAgent(player, node_budget=600, search=search)
+                    agent.play(state)
+                    with self.subTest(search=search, anytime=True):
+                        self.assert_consistent_table(agent, positions, values)
+
+    def test_unknown_search(self):
+        with self.assertRaises(ValueError):
+            AlphaBetaAgent(othello.Player.DARK, search='negascout')
+
+
+if __name__ == '__main__':
+    unittest.main()
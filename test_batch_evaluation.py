@@ -0,0 +1,102 @@
+import random
+import unittest
+
+import evaluation
+import othello
+from expectimax_agent import ExpectimaxAgent
+from max_agent import MaxAgent
+from test_othello_bitboard import random_states
+
+try:
+    import numpy as np
+    import batch_othello
+    import pattern_evaluation
+except ImportError:
+    batch_othello = None
+
+
+@unittest.skipIf(batch_othello is None, 'NumPy is not installed')
+class TestEvaluateBatch(unittest.TestCase):
+    def setUp(self):
+        self.states = [state for state, _ in random_states(10, 0)]
+        self.dark, self.light = batch_othello.boards_from_states(self.states)
+
+    def assertSameScores(self, eval_func):
+        for player in othello.Player:
+            scores = evaluation.evaluate_batch(eval_func, self.dark,
+                                               self.light, player)
+            self.assertEqual(scores.tolist(),
+                             [eval_func(state, player)
+                              for state in self.states])
+
+    def test_heuristics(self):
+        for eval_func in (evaluation.heuristic_eval_number,
+                          evaluation.heuristic_eval_edge,
+                          evaluation.heuristic_eval_corner,
+                          evaluation.heuristic_eval_n_action,
+                          evaluation.heuristic_eval_adversary_n_action,
+                          evaluation.heuristic_eval_comprehensive):
+            self.assertTrue(evaluation.has_batch(eval_func))
+            self.assertSameScores(eval_func)
+
+    def test_pattern(self):
+        self.assertTrue(evaluation.has_batch(pattern_evaluation.pattern_eval))
+        self.assertSameScores(pattern_evaluation.pattern_eval)
+
+    def test_fallback(self):
+        self.assertFalse(
+            evaluation.has_batch(evaluation.heuristic_eval_stable))
+        self.assertSameScores(evaluation.heuristic_eval_stable)
+
+    def test_features(self):
+        import batch_evaluation
+
+        features = batch_evaluation.features(self.dark, self.light,
+                                             othello.Player.LIGHT)
+        self.assertEqual(
+            features.tolist(),
+            [list(evaluation.extract_features(state, othello.Player.LIGHT))
+             for state in self.states])
+
+
+@unittest.skipIf(batch_othello is None, 'NumPy is not installed')
+class TestBatchAgents(unittest.TestCase):
+    def setUp(self):
+        self.states = [state for state, _ in random_states(2, 0)]
+
+    def assertSameGame(self, agent_type, **kwargs):
+        games = []
+
+        for batch in (False, True):
+            random.seed(0)
+            referee = othello.Referee(
+                agent_type(othello.Player.DARK, batch=batch, **kwargs),
+                agent_type(othello.Player.LIGHT, batch=batch, **kwargs))
+            referee.run()
+            games.append(referee.game.state)
+
+        self.assertEqual(games[0], games[1])
+
+    def test_max_agent(self):
+        self.assertSameGame(MaxAgent)
+
+    def test_expectimax_agent(self):
+        for search_depth in (1, 2):
+            for make_unmake in (False, True):
+                for state in self.states[::8]:
+                    for player in othello.Player:
+                        results = []
+                        for batch in (False, True):
+                            random.seed(0)
+                            agent = ExpectimaxAgent(
+                                player, search_depth, batch=batch,
+                                make_unmake=make_unmake)
+                            results.append((agent.play(state), agent.score))
+
+                        self.assertEqual(results[0], results[1])
+
+        self.assertSameGame(ExpectimaxAgent, search_depth=1)
+        self.assertSameGame(ExpectimaxAgent, search_depth=1, make_unmake=True)
+
+if __name__ == '__main__':
+    unittest.main()
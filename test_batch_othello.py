@@ -0,0 +1,68 @@
+import unittest
+
+import othello
+from test_othello_bitboard import random_states
+
+try:
+    import numpy as np
+    import batch_othello
+except ImportError:  # NumPy is an optional dependency.
+    np = None
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class TestBatchOthello(unittest.TestCase):
+    def setUp(self):
+        self.states = [state for state, _ in random_states(10, 4)]
+        self.dark, self.light = batch_othello.boards_from_states(self.states)
+
+    def test_conversion(self):
+        self.assertEqual(
+            batch_othello.states_from_boards(self.dark, self.light),
+            self.states)
+
+    def test_mobility(self):
+        for player in othello.Player:
+            self.assertEqual(
+                batch_othello.mobility(self.dark, self.light, player).tolist(),
+                [s.mobility_mask(player) for s in self.states])
+
+    def test_flips(self):
+        for player in othello.Player:
+            for ix in range(64):
+                action = othello.Action(othello.Coords(ix))
+                self.assertEqual(
+                    batch_othello.flips(self.dark, self.light, player,
+                                        ix).tolist(),
+                    [s.get_flips(player, action) for s in self.states])
+
+    def test_expand(self):
+        for player in othello.Player:
+            parent, ix, mask, child_dark, child_light \
+                = batch_othello.expand(self.dark, self.light, player)
+
+            expected = [(i, action.coords.ix,
+                         state.get_flips(player, action),
+                         state.perform_action(player, action))
+                        for i, state in enumerate(self.states)
+                        for action in state.get_legal_actions(player)]
+            children = batch_othello.states_from_boards(child_dark,
+                                                        child_light)
+
+            self.assertEqual(
+                list(zip(parent.tolist(), ix.tolist(), mask.tolist(),
+                         children)),
+                expected)
+
+    def test_perform(self):
+        player = othello.Player.DARK
+        dark, light = batch_othello.perform(self.dark[:1], self.light[:1],
+                                            player, 19)  # d3
+
+        self.assertEqual(
+            batch_othello.states_from_boards(dark, light),
+            [self.states[0].perform_action(
+                player, othello.Action(othello.Coords(19)))])
+
+        with self.assertRaises(ValueError):
+            batch_othello.perform(self.dark[:1], self.light[:1], player, 0)
@@ -0,0 +1,89 @@
+import unittest
+
+import evaluation
+import othello
+from test_othello_bitboard import random_states
+
+
+def reference_features(state: othello.State, player: othello.Player):
+    """The features computed square by square from coordinate strings."""
+    edge_point = []
+    for i in range(2, 8):
+        edge_point.append('a' + str(i))
+        edge_point.append('h' + str(i))
+    for char in range(ord('b'), ord('h')):
+        edge_point.append(chr(char) + '1')
+        edge_point.append(chr(char) + '8')
+
+    def count(points):
+        return sum(state.board[othello.Coords.from_repr(point)] is player
+                   for point in points)
+
+    return (sum(state.board[othello.Coords(i)] is player for i in range(64)),
+            count(edge_point), count(['a1', 'a8', 'h1', 'h8']),
+            len(list(state.get_legal_actions(player))),
+            -len(list(state.get_legal_actions(player.adversary))))
+
+
+class TestFeatures(unittest.TestCase):
+    def test_against_reference(self):
+        for state, _ in random_states(20, 0):
+            for player in othello.Player:
+                self.assertEqual(evaluation.extract_features(state, player),
+                                 reference_features(state, player))
+
+    def test_heuristics(self):
+        heuristics = (evaluation.heuristic_eval_number,
+                      evaluation.heuristic_eval_edge,
+                      evaluation.heuristic_eval_corner,
+                      evaluation.heuristic_eval_n_action,
+                      evaluation.heuristic_eval_adversary_n_action)
+
+        for state, _ in random_states(5, 1):
+            for player in othello.Player:
+                features = evaluation.extract_features(state, player)
+                self.assertEqual(
+                    tuple(h(state, player) for h in heuristics), features)
+                self.assertEqual(
+                    evaluation.heuristic_eval_comprehensive(state, player),
+                    2 * features[0] + 5 * features[1] + 10 * features[2]
+                    + features[3] + features[4])
+
+
+class TestCachedEvaluation(unittest.TestCase):
+    def test_same_scores(self):
+        cached = evaluation.CachedEvaluation(
+            evaluation.heuristic_eval_comprehensive, 64)
+
+        for _ in range(2):
+            for state, _ in random_states(5, 2):
+                for player in othello.Player:
+                    self.assertEqual(
+                        cached(state, player),
+                        evaluation.heuristic_eval_comprehensive(state, player))
+
+        self.assertGreater(cached.cache.evictions, 0)
+        self.assertLessEqual(len(cached.cache), 64)
+
+    def test_hits(self):
+        calls = []
+
+        def eval_func(state, player):
+            calls.append((state, player))
+            return 0
+
+        cached = evaluation.CachedEvaluation(eval_func)
+        state = othello.State.initial()
+
+        for _ in range(3):
+            cached(state, othello.Player.DARK)
+            cached(othello.State(othello.Board.initial()), othello.Player.DARK)
+        cached(state, othello.Player.LIGHT)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cached.cache.hits, 5)
+        self.assertAlmostEqual(cached.hit_rate, 5 / 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from lru import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction(self):
+        cache: LRUCache[str, int] = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)  # 'b' is now least recent.
+        cache.put('c', 3)
+
+        self.assertNotIn('b', cache)
+        self.assertIn('a', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_stats(self):
+        cache: LRUCache[str, int] = LRUCache(2)
+        cache.put('a', 1)
+        cache.get('a')
+        cache.get('b')
+
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate, .5)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get('a'))
+
+    def test_resize(self):
+        cache: LRUCache[int, int] = LRUCache(4)
+        for i in range(4):
+            cache.put(i, i)
+        cache.resize(1)
+
+        self.assertEqual(len(cache), 1)
+        self.assertIn(3, cache)
+        self.assertEqual(cache.evictions, 3)
+
+    def test_disabled(self):
+        cache: LRUCache[int, int] = LRUCache(0)
+        cache.put(0, 0)
+
+        self.assertEqual(len(cache), 0)
@@ -0,0 +1,74 @@
+import unittest
+
+import othello
+
+try:
+    import batch_othello
+except ImportError:
+    batch_othello = None
+
+
+class TestBackends(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(othello.set_backend, othello.get_backend())
+
+    def test_bitboard_against_reference(self):
+        othello.differential_check(othello.BitboardBackend(),
+                                   othello.ReferenceBackend(), 5)
+
+    @unittest.skipIf(batch_othello is None, 'NumPy is not installed')
+    def test_numpy_against_bitboard(self):
+        othello.differential_check(othello.BitboardBackend(),
+                                   othello.make_backend('numpy'), 5)
+
+    def test_disagreement(self):
+        class BrokenBackend(othello.BitboardBackend):
+            name = 'broken'
+
+            def flips(self, own: int, opp: int, ix: int) -> int:
+                if ix == othello.Coords.from_repr('d3').ix:
+                    return 0x0
+                return othello.bitboard_flips(own, opp, ix)
+
+        with self.assertRaises(AssertionError):
+            othello.differential_check(othello.BitboardBackend(),
+                                       BrokenBackend(), 5)
+
+    def test_statistics(self):
+        backend = othello.differential_check(othello.BitboardBackend(),
+                                             othello.ReferenceBackend(), 1)
+
+        self.assertEqual(set(backend.elapsed), {'first', 'second'})
+        self.assertGreater(backend.n_calls['mobility'], 0)
+        self.assertGreater(backend.n_calls['flips'], 0)
+
+    def test_same_name(self):
+        backend = othello.differential_check(othello.BitboardBackend(),
+                                             othello.BitboardBackend(), 1)
+
+        self.assertEqual(backend.name, 'bitboard+bitboard')
+        self.assertGreater(backend.elapsed['first'], 0)
+        self.assertGreater(backend.elapsed['second'], 0)
+
+    def test_set_backend(self):
+        othello.set_backend('bitboard+reference')
+        self.assertIsInstance(othello.get_backend(),
+                              othello.DifferentialBackend)
+
+        game = othello.Game(othello.State.initial())
+        while game.get_conclusion() is None:
+            action = next(iter(game.state.get_legal_actions(game.next_player)),
+                          None)
+            game.play(game.next_player, action)
+
+        self.assertGreater(othello.get_backend().n_calls['mobility'], 0)
+
+    def test_unknown(self):
+        for name in ('nonexistent', 'bitboard+nonexistent',
+                     'bitboard+reference+bitboard'):
+            with self.assertRaises(ValueError):
+                othello.make_backend(name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+import random
+import unittest
+
+import othello
+
+
+def random_states(n_games: int, seed: int):
+    """Yield the (state, player to move) pairs visited by random games."""
+    rng = random.Random(seed)
+
+    for _ in range(n_games):
+        game = othello.Game(othello.State.initial())
+
+        while game.get_conclusion() is None:
+            yield game.state, game.next_player
+
+            legal_actions = list(
+                game.state.get_legal_actions(game.next_player))
+            game.play(game.next_player,
+                      rng.choice(legal_actions) if legal_actions else None)
+
+
+class CountingBackend(othello.BitboardBackend):
+    """Bitboard backend counting the calls of mobility."""
+
+    def __init__(self) -> None:
+        self.n_mobility = 0
+
+    def mobility(self, own: int, opp: int) -> int:
+        self.n_mobility += 1
+        return othello.bitboard_mobility(own, opp)
+
+
+class TestBitboardMobility(unittest.TestCase):
+    def test_initial(self):
+        state = othello.State.initial()
+
+        self.assertEqual(
+            state.mobility_mask(othello.Player.DARK),
+            sum(1 << othello.Coords.from_repr(a).ix
+                for a in ('d3', 'c4', 'f5', 'e6')))
+
+    def test_against_flips(self):
+        for state, _ in random_states(20, 0):
+            for player in othello.Player:
+                expected = sum(1 << i for i in range(64)
+                               if state.get_flips(
+                                   player, othello.Action(othello.Coords(i))))
+                self.assertEqual(state.mobility_mask(player), expected)
+
+    def test_cached(self):
+        state = othello.State.initial()
+
+        backend = CountingBackend()
+        self.addCleanup(othello.set_backend, othello.get_backend())
+        othello.set_backend(backend)
+
+        game = othello.Game(state)
+        while game.get_conclusion() is None:
+            self.assertIsNone(state.get_conclusion())
+            self.assertFalse(state.is_terminal())
+            action = next(iter(state.get_legal_actions(game.next_player)),
+                          None)
+            game.play(game.next_player, action)
+            state = game.state
+
+        self.assertLessEqual(backend.n_mobility, 2 * 61)
+
+    def test_iter_bits(self):
+        self.assertEqual(list(othello.iter_bits(0)), [])
+        self.assertEqual(list(othello.iter_bits(0x8000000000000005)),
+                         [0, 2, 63])
+
+
+class TestBitboardFlips(unittest.TestCase):
+    def test_against_reference(self):
+        actions = [othello.Action(othello.Coords(i)) for i in range(64)]
+
+        for state, _ in random_states(20, 1):
+            for player in othello.Player:
+                for action in actions:
+                    self.assertEqual(
+                        state.get_flips(player, action),
+                        state.get_flips_reference(player, action))
+
+    def test_occupied(self):
+        state = othello.State.initial()
+        action = othello.Action(othello.Coords.from_repr('d4'))
+
+        self.assertEqual(state.get_flips(othello.Player.DARK, action), 0)
+
+
+class TestZobrist(unittest.TestCase):
+    def test_incremental(self):
+        for state, player in random_states(10, 2):
+            self.assertEqual(
+                state.board.zobrist,
+                othello.zobrist_hash(state.board.dark_board,
+                                     state.board.light_board))
+            self.assertNotEqual(state.hash_key(player),
+                                state.hash_key(player.adversary))
+
+    def test_search_position(self):
+        state = othello.State.initial()
+        position = othello.SearchPosition(state)
+        action = othello.Action(othello.Coords.from_repr('d3'))
+
+        undo = position.make(othello.Player.DARK, action)
+        self.assertEqual(
+            position.hash_key(othello.Player.LIGHT),
+            state.perform_action(othello.Player.DARK, action)
+                 .hash_key(othello.Player.LIGHT))
+
+        position.unmake(undo)
+        self.assertEqual(position.zobrist, state.board.zobrist)
+
+
+class TestSymmetry(unittest.TestCase):
+    MAPPINGS = {
+        othello.Symmetry.IDENTITY: lambda f, r: (f, r),
+        othello.Symmetry.ROTATE_90: lambda f, r: (r, 7-f),
+        othello.Symmetry.ROTATE_180: lambda f, r: (7-f, 7-r),
+        othello.Symmetry.ROTATE_270: lambda f, r: (7-r, f),
+        othello.Symmetry.FLIP_VERTICAL: lambda f, r: (f, 7-r),
+        othello.Symmetry.FLIP_HORIZONTAL: lambda f, r: (7-f, r),
+        othello.Symmetry.FLIP_DIAGONAL: lambda f, r: (r, f),
+        othello.Symmetry.FLIP_ANTI_DIAGONAL: lambda f, r: (7-r, 7-f),
+    }
+
+    def test_squares(self):
+        for symmetry, mapping in self.MAPPINGS.items():
+            for coords in map(othello.Coords, range(64)):
+                self.assertEqual(
+                    symmetry.apply_coords(coords),
+                    othello.Coords.from_file_rank(
+                        *mapping(coords.file, coords.rank)))
+                self.assertEqual(
+                    symmetry.inverse.apply_coords(
+                        symmetry.apply_coords(coords)),
+                    coords)
+
+    def test_canonical(self):
+        for state, player in random_states(5, 3):
+            canonical, symmetry = state.board.canonical()
+            self.assertEqual(state.board.transform(symmetry), canonical)
+
+            for other in othello.Symmetry:
+                transformed = state.board.transform(other)
+                self.assertEqual(transformed.canonical()[0], canonical)
+
+                # Symmetric positions have symmetric legal moves.
+                self.assertEqual(
+                    othello.State(transformed).mobility_mask(player),
+                    other.apply(state.mobility_mask(player)))
+
+
+class TestChildren(unittest.TestCase):
+    def test_against_perform_action(self):
+        for state, player in random_states(10, 5):
+            self.assertEqual(
+                state.children(player),
+                [(action, state.perform_action(player, action),
+                  state.get_flips(player, action))
+                 for action in state.get_legal_actions(player)])
+
+
+class TestStable(unittest.TestCase):
+    def test_simple(self):
+        self.assertEqual(othello.bitboard_stable(0, 0), 0)
+        self.assertEqual(othello.bitboard_stable(0x1, 0x2), 0x1)
+        self.assertEqual(othello.bitboard_stable(othello._FULL, 0),
+                         othello._FULL)
+        self.assertEqual(
+            othello.State.initial().n_stable(othello.Player.DARK), 0)
+
+    def test_never_flipped(self):
+        rng = random.Random(1)
+
+        for state, player in random_states(20, 2):
+            dark_stable = othello.bitboard_stable(state.board.dark_board,
+                                                  state.board.light_board)
+            light_stable = othello.bitboard_stable(state.board.light_board,
+                                                   state.board.dark_board)
+            bounds = {p: state.disc_difference_bounds(p)
+                      for p in othello.Player}
+
+            while state.get_conclusion() is None:
+                legal_actions = list(state.get_legal_actions(player))
+                if legal_actions != []:
+                    state = state.perform_action(player,
+                                                 rng.choice(legal_actions))
+                player = player.adversary
+
+                self.assertEqual(dark_stable & ~state.board.dark_board, 0)
+                self.assertEqual(light_stable & ~state.board.light_board, 0)
+
+            for p in othello.Player:
+                lower, upper = bounds[p]
+                difference = state.n_number(p) - state.n_number(p.adversary)
+                self.assertLessEqual(lower, difference)
+                self.assertLessEqual(difference, upper)
@@ -0,0 +1,94 @@
+import pickle
+import unittest
+
+import othello
+
+
+class TestInterning(unittest.TestCase):
+    def test_coords(self):
+        for ix in range(64):
+            coords = othello.Coords(ix)
+
+            self.assertIs(othello.Coords(ix), coords)
+            self.assertIs(othello.Coords.unchecked(ix), coords)
+            self.assertIs(othello.Coords.from_repr(coords.repr), coords)
+            self.assertIs(othello.Coords.from_file_rank(coords.file,
+                                                        coords.rank), coords)
+
+    def test_action(self):
+        for ix in range(64):
+            action = othello.Action(othello.Coords(ix))
+
+            self.assertIs(othello.Action(othello.Coords(ix)), action)
+            self.assertIs(othello.Action.unchecked(ix), action)
+            self.assertIs(action.coords, othello.Coords(ix))
+
+    def test_legal_actions(self):
+        state = othello.State.initial()
+
+        for action in state.get_legal_actions(othello.Player.DARK):
+            self.assertIs(othello.Action(action.coords), action)
+
+
+class TestPickle(unittest.TestCase):
+    def setUp(self):
+        self.state = othello.State.initial().perform_action(
+            othello.Player.DARK,
+            othello.Action(othello.Coords.from_repr('d3')))
+
+    def test_interned(self):
+        for ix in (0, 19, 63):
+            coords = othello.Coords(ix)
+            action = othello.Action(coords)
+
+            self.assertIs(pickle.loads(pickle.dumps(coords)), coords)
+            self.assertIs(pickle.loads(pickle.dumps(action)), action)
+
+    def test_board(self):
+        board = self.state.board
+        copy = pickle.loads(pickle.dumps(board))
+
+        self.assertEqual(copy, board)
+        self.assertEqual(copy.zobrist, board.zobrist)
+
+    def test_state(self):
+        copy = pickle.loads(pickle.dumps(self.state))
+
+        self.assertEqual(copy, self.state)
+        self.assertEqual(copy.mobility_mask(othello.Player.LIGHT),
+                         self.state.mobility_mask(othello.Player.LIGHT))
+
+
+class TestValidation(unittest.TestCase):
+    def test_coords(self):
+        for ix in (-1, 64):
+            with self.assertRaises(ValueError):
+                othello.Coords(ix)
+
+        for string in ('z9', 'a0', 'a', 'a10'):
+            with self.assertRaises(ValueError):
+                othello.Coords.from_repr(string)
+
+        with self.assertRaises(ValueError):
+            othello.Coords.from_file_rank(8, 0)
+
+    def test_board(self):
+        with self.assertRaises(ValueError):
+            othello.Board(-1, 0)
+        with self.assertRaises(ValueError):
+            othello.Board(0, 1 << 64)
+        with self.assertRaises(ValueError):
+            othello.Board(0x1, 0x3)
+
+    def test_unchecked(self):
+        # Squares played by both players are only rejected by the checked
+        # constructor.
+        board = othello.Board.unchecked(0x1, 0x3)
+        self.assertEqual((board.dark_board, board.light_board), (0x1, 0x3))
+
+        state = othello.State.unchecked(board)
+        self.assertIs(state.board, board)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import random
+import tempfile
+import unittest
+
+import evaluation
+import othello
+from alpha_beta_agent import AlphaBetaAgent
+from test_othello_bitboard import random_states
+
+try:
+    import numpy as np
+    import pattern_evaluation
+except ImportError:
+    pattern_evaluation = None
+
+
+def reference_indices(own: int, opp: int) -> list[int]:
+    """The pattern indices computed square by square."""
+    indices = []
+    for name, instances in pattern_evaluation.INSTANCES.items():
+        for instance in instances:
+            index = 0
+            for k, ix in enumerate(instance):
+                if (own >> ix) & 0x1:
+                    index += 3 ** k
+                elif (opp >> ix) & 0x1:
+                    index += 2 * 3 ** k
+            indices.append(pattern_evaluation.OFFSETS[name] + index)
+    return indices
+
+
+@unittest.skipIf(pattern_evaluation is None, 'NumPy is not installed')
+class TestPatternEvaluation(unittest.TestCase):
+    def test_indices(self):
+        for state, _ in random_states(10, 0):
+            own = state.board.dark_board
+            opp = state.board.light_board
+            self.assertEqual(pattern_evaluation.pattern_indices(own, opp),
+                             reference_indices(own, opp))
+
+    def test_bootstrap(self):
+        evaluator = pattern_evaluation.PatternEvaluator()
+        values = pattern_evaluation.SQUARE_VALUES
+
+        for state, _ in random_states(10, 1):
+            dark = sum(values[ix]
+                       for ix in othello.iter_bits(state.board.dark_board))
+            light = sum(values[ix]
+                        for ix in othello.iter_bits(state.board.light_board))
+            self.assertAlmostEqual(evaluator(state, othello.Player.DARK),
+                                   dark - light, places=3)
+            self.assertAlmostEqual(evaluator(state, othello.Player.LIGHT),
+                                   light - dark, places=3)
+
+    def test_symmetric(self):
+        for state, _ in random_states(5, 2):
+            expected = pattern_evaluation.pattern_eval(
+                state, othello.Player.DARK)
+            for symmetry in othello.Symmetry:
+                transformed = othello.State(state.board.transform(symmetry))
+                self.assertAlmostEqual(
+                    pattern_evaluation.pattern_eval(
+                        transformed, othello.Player.DARK),
+                    expected, places=3)
+
+    def test_file(self):
+        weights = np.arange(pattern_evaluation.N_WEIGHTS, dtype=np.float32)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'weights.npy')
+            pattern_evaluation.save_weights(weights, path)
+            evaluator = pattern_evaluation.PatternEvaluator.from_file(path)
+
+            self.assertIsInstance(evaluator.weights, np.memmap)
+            state = othello.State.initial()
+            self.assertEqual(
+                evaluator(state, othello.Player.DARK),
+                sum(pattern_evaluation.pattern_indices(
+                    state.board.dark_board, state.board.light_board)))
+            del evaluator
+
+        with self.assertRaises(ValueError):
+            pattern_evaluation.save_weights(weights[1:], path)
+
+    def test_incremental(self):
+        rng = random.Random(3)
+        state = othello.State.initial()
+        incremental = evaluation.incremental(pattern_evaluation.pattern_eval,
+                                             state)
+        position = othello.SearchPosition(state, [incremental])
+        player = othello.Player.DARK
+        history = []
+
+        while not position.is_terminal():
+            for p in othello.Player:
+                self.assertEqual(
+                    incremental.evaluate(position, p),
+                    pattern_evaluation.pattern_eval(position.state, p))
+
+            legal_actions = position.get_legal_actions(player)
+            if legal_actions != []:
+                history.append(position.make(player, rng.choice(legal_actions)))
+            player = player.adversary
+
+        for undo in reversed(history):
+            position.unmake(undo)
+
+        self.assertEqual(
+            incremental.evaluate(position, othello.Player.DARK),
+            pattern_evaluation.pattern_eval(state, othello.Player.DARK))
+
+    def test_agent(self):
+        agent = AlphaBetaAgent(othello.Player.DARK, 1,
+                               pattern_evaluation.pattern_eval)
+        self.assertIn(agent.play(othello.State.initial()),
+                      othello.State.initial().get_legal_actions(
+                          othello.Player.DARK))
+
+
+if __name__ == '__main__':
+    unittest.main()
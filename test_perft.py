@@ -0,0 +1,37 @@
+import unittest
+
+import othello
+import perft
+
+
+class TestPerft(unittest.TestCase):
+    def test_initial(self):
+        state = othello.State.initial()
+
+        for depth in range(6):
+            self.assertEqual(perft.perft(state, othello.Player.DARK, depth),
+                             perft.KNOWN_COUNTS[depth])
+
+    def test_parallel(self):
+        state = othello.State.initial()
+
+        self.assertEqual(
+            perft.parallel_perft(state, othello.Player.DARK, 4, 2),
+            perft.KNOWN_COUNTS[4])
+
+    def test_pass(self):
+        rep = ('XXXXXXXX',
+               'XXXXXXXX',
+               'XXXXXXXX',
+               'XXXXXXXX',
+               'XXXXXXXX',
+               'XXXXXXXX',
+               'XXXXXXO.',
+               'XXXXXX..')
+        state = othello.State(othello.Board.from_repr(rep))
+
+        # Light has to pass, which counts as a move.
+        self.assertEqual(perft.perft(state, othello.Player.LIGHT, 1), 1)
+        self.assertEqual(perft.perft(state, othello.Player.LIGHT, 2), 3)
+        # Each of the 3 moves of dark ends the game, so each is a leaf.
+        self.assertEqual(perft.perft(state, othello.Player.DARK, 3), 3)
@@ -0,0 +1,123 @@
+import random
+import unittest
+
+import evaluation
+import othello
+from alpha_beta_agent import AlphaBetaAgent, BudgetExhausted
+from expectimax_agent import ExpectimaxAgent
+from minimax_agent import MinimaxAgent
+
+
+class TestSearchPosition(unittest.TestCase):
+    def test_make_unmake(self):
+        rng = random.Random(0)
+
+        for _ in range(20):
+            state = othello.State.initial()
+            position = othello.SearchPosition(state)
+            player = othello.Player.DARK
+            history = []
+
+            while not state.is_terminal():
+                self.assertEqual(position.state, state)
+                self.assertEqual(position.mobility_mask(player),
+                                 state.mobility_mask(player))
+
+                legal_actions = list(state.get_legal_actions(player))
+                if legal_actions != []:
+                    action = rng.choice(legal_actions)
+                    history.append((state, position.make(player, action)))
+                    state = state.perform_action(player, action)
+                player = player.adversary
+
+            self.assertIs(position.get_conclusion(), state.get_conclusion())
+
+            for state, undo in reversed(history):
+                position.unmake(undo)
+                self.assertEqual(position.state, state)
+
+    def test_illegal(self):
+        position = othello.SearchPosition(othello.State.initial())
+        action = othello.Action(othello.Coords.from_repr('a1'))
+
+        with self.assertRaises(ValueError):
+            position.make(othello.Player.DARK, action)
+
+
+class TestIncrementalEvaluation(unittest.TestCase):
+    def test_comprehensive(self):
+        rng = random.Random(1)
+
+        for _ in range(10):
+            state = othello.State.initial()
+            incremental = evaluation.incremental(
+                evaluation.heuristic_eval_comprehensive, state)
+            position = othello.SearchPosition(state, [incremental])
+            player = othello.Player.DARK
+            history = []
+
+            while not position.is_terminal():
+                for p in othello.Player:
+                    self.assertEqual(
+                        incremental.evaluate(position, p),
+                        evaluation.heuristic_eval_comprehensive(
+                            position.state, p))
+
+                legal_actions = position.get_legal_actions(player)
+                if legal_actions != []:
+                    history.append(position.make(player,
+                                                 rng.choice(legal_actions)))
+                player = player.adversary
+
+            for undo in reversed(history):
+                position.unmake(undo)
+
+            self.assertEqual(
+                incremental.counts,
+                evaluation.IncrementalComprehensive(state).counts)
+
+    def test_unsupported(self):
+        cached = evaluation.CachedEvaluation(
+            evaluation.heuristic_eval_comprehensive)
+        self.assertIsNone(
+            evaluation.incremental(cached, othello.State.initial()))
+
+
+class TestMakeUnmakeAgents(unittest.TestCase):
+    def assertSameGame(self, agent_type, **kwargs):
+        games = []
+
+        for make_unmake in (False, True):
+            random.seed(0)
+            referee = othello.Referee(
+                agent_type(othello.Player.DARK, make_unmake=make_unmake,
+                           **kwargs),
+                agent_type(othello.Player.LIGHT, make_unmake=make_unmake,
+                           **kwargs))
+            referee.run()
+            games.append(referee.game.state)
+
+        self.assertEqual(games[0], games[1])
+
+    def test_alpha_beta_agent(self):
+        self.assertSameGame(AlphaBetaAgent, search_depth=1)
+
+    def test_minimax_agent(self):
+        self.assertSameGame(MinimaxAgent, search_depth=1)
+
+    def test_expectimax_agent(self):
+        self.assertSameGame(ExpectimaxAgent, search_depth=1)
+
+    def test_aborted_search(self):
+        agent = AlphaBetaAgent(othello.Player.DARK, make_unmake=True)
+        state = othello.State.initial()
+        root = agent.search_root(state)
+        action, child = agent.successors(root, othello.Player.DARK)[0]
+
+        def search(node):
+            raise BudgetExhausted()
+
+        with self.assertRaises(BudgetExhausted):
+            agent.search_child(root, othello.Player.DARK, action, child,
+                               search)
+        self.assertEqual(root.state, state)
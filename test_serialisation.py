@@ -0,0 +1,81 @@
+import pickle
+import unittest
+
+import othello
+from test_othello_bitboard import random_states
+
+try:
+    import numpy as np
+    import batch_othello
+except ImportError:
+    batch_othello = None
+
+
+class TestStateBytes(unittest.TestCase):
+    def test_round_trip(self):
+        for state, _ in random_states(5, 0):
+            data = state.to_bytes()
+            self.assertEqual(len(data), 16)
+            self.assertEqual(othello.State.from_bytes(data), state)
+
+    def test_smaller_than_pickle(self):
+        state = othello.State.initial()
+        self.assertLess(len(state.to_bytes()), len(pickle.dumps(state)))
+
+    def test_invalid(self):
+        for data in (b'', bytes(15), bytes(17), b'\xff' * 16):
+            with self.assertRaises(ValueError):
+                othello.State.from_bytes(data)
+
+
+class TestGameBytes(unittest.TestCase):
+    def test_round_trip(self):
+        for state, player in random_states(5, 1):
+            game = othello.Game(state, player)
+            data = game.to_bytes()
+            self.assertEqual(len(data), 17)
+            self.assertEqual(othello.Game.from_bytes(data), game)
+
+    def test_invalid(self):
+        data = othello.Game().to_bytes()
+
+        with self.assertRaises(ValueError):
+            othello.Game.from_bytes(data[:-1] + b'\x02')
+        with self.assertRaises(ValueError):
+            othello.Game.from_bytes(data[:-1])
+
+
+class TestPackStates(unittest.TestCase):
+    def test_round_trip(self):
+        states = [state for state, _ in random_states(5, 2)]
+        data = othello.pack_states(states)
+
+        self.assertEqual(data, b''.join(s.to_bytes() for s in states))
+        self.assertEqual(othello.unpack_states(data), states)
+        self.assertEqual(othello.unpack_states(memoryview(data)[16:48]),
+                         states[1:3])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            othello.unpack_states(bytes(24))
+        with self.assertRaises(ValueError):
+            othello.unpack_states(b'\xff' * 16)
+
+    @unittest.skipIf(batch_othello is None, 'NumPy is not installed')
+    def test_numpy(self):
+        states = [state for state, _ in random_states(5, 3)]
+        data = othello.pack_states(states)
+
+        dark, light = batch_othello.boards_from_bytes(data)
+        self.assertEqual(batch_othello.states_from_boards(dark, light), states)
+        self.assertEqual(batch_othello.boards_to_bytes(dark, light), data)
+
+        games = [othello.Game(state, othello.Player.LIGHT) for state in states]
+        records = np.frombuffer(b''.join(g.to_bytes() for g in games),
+                                dtype=batch_othello.GAME_DTYPE)
+        self.assertTrue(np.all(records['next_player'] == 1))
+        self.assertTrue(np.array_equal(records['dark_board'], dark))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+import evaluation
+import othello
+
+try:
+    import numpy as np
+    import batch_evaluation
+    import pattern_evaluation
+    import train
+except ImportError:
+    train = None
+
+
+@unittest.skipIf(train is None, 'NumPy is not installed')
+class TestTrain(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.path = os.path.join(directory.name, 'data.bin')
+        self.n_records = train.record_games(self.path, 20)
+
+    def test_record(self):
+        self.assertEqual(os.path.getsize(self.path),
+                         self.n_records * train.SAMPLE_DTYPE.itemsize)
+
+        records = np.concatenate(list(train.iter_chunks(self.path, 100)))
+        self.assertEqual(len(records), self.n_records)
+        self.assertTrue(np.all(
+            records['dark_board'] & records['light_board'] == 0))
+
+    def test_linear(self):
+        records = np.fromfile(self.path, dtype=train.SAMPLE_DTYPE)
+        dark = records['dark_board']
+        light = records['light_board']
+        x = np.concatenate([
+            batch_evaluation.features(dark, light, othello.Player.DARK),
+            batch_evaluation.features(dark, light, othello.Player.LIGHT)])
+        y = np.concatenate([records['disc_difference'],
+                            -records['disc_difference']])
+        expected, *_ = np.linalg.lstsq(x.astype(np.float64), y, rcond=None)
+
+        weights = train.fit_linear(self.path, chunk_size=100,
+                                   regularisation=0.)
+        np.testing.assert_allclose(weights, expected, rtol=1e-6, atol=1e-9)
+
+        path = os.path.join(self.directory, 'weights.json')
+        evaluation.save_weights(weights, path)
+        self.assertEqual(evaluation.load_weights(path), tuple(weights))
+
+    def test_pattern(self):
+        records = np.fromfile(self.path, dtype=train.SAMPLE_DTYPE)
+        dark = records['dark_board']
+        light = records['light_board']
+
+        def mean_squared_error(weights):
+            evaluator = pattern_evaluation.PatternEvaluator(weights)
+            scores = evaluator.evaluate_batch(dark, light, othello.Player.DARK)
+            return np.mean((scores - records['disc_difference']) ** 2)
+
+        weights = train.fit_pattern(self.path, n_epochs=2, chunk_size=100)
+        self.assertEqual(weights.shape, (pattern_evaluation.N_WEIGHTS,))
+        self.assertLess(mean_squared_error(weights),
+                        mean_squared_error(np.zeros_like(weights)))
+
+    def test_invalid_weights(self):
+        path = os.path.join(self.directory, 'weights.json')
+        with open(path, 'w') as f:
+            f.write('{"number": 1}')
+
+        with self.assertRaises(ValueError):
+            evaluation.load_weights(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+import othello
+from alpha_beta_agent import AlphaBetaAgent
+from test_othello_bitboard import random_states
+from transposition import Bound, TranspositionTable
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_size(self):
+        self.assertEqual(TranspositionTable(1000).size, 512)
+        self.assertEqual(TranspositionTable(1024).size, 1024)
+
+        with self.assertRaises(ValueError):
+            TranspositionTable(0)
+
+    def test_store_probe(self):
+        tt = TranspositionTable(16)
+        action = othello.Action(othello.Coords.from_repr('d3'))
+
+        self.assertIsNone(tt.probe(5))
+        tt.store(5, 3, Bound.EXACT, 1.5, action)
+        entry = tt.probe(5)
+        self.assertEqual((entry.depth, entry.bound, entry.score, entry.move),
+                         (3, Bound.EXACT, 1.5, action))
+        # Same slot, other position.
+        self.assertIsNone(tt.probe(5 + 16))
+
+        self.assertEqual((tt.probes, tt.hits, tt.stores), (3, 1, 1))
+        self.assertAlmostEqual(tt.hit_rate, 1 / 3)
+
+    def test_replacement(self):
+        tt = TranspositionTable(16)
+        tt.new_search()
+
+        tt.store(1, 5, Bound.EXACT, 0, None)
+        # A shallower entry of the current search does not replace it.
+        tt.store(17, 2, Bound.EXACT, 0, None)
+        self.assertIsNotNone(tt.probe(1))
+        self.assertIsNone(tt.probe(17))
+
+        # An entry at least as deep does.
+        tt.store(17, 5, Bound.EXACT, 0, None)
+        self.assertIsNone(tt.probe(1))
+        self.assertIsNotNone(tt.probe(17))
+
+        # Any entry replaces one of an earlier search.
+        tt.new_search()
+        tt.store(1, 1, Bound.EXACT, 0, None)
+        self.assertIsNotNone(tt.probe(1))
+        self.assertEqual(tt.overwrites, 2)
+
+    def test_cutoff(self):
+        tt = TranspositionTable(16)
+
+        tt.store(1, 3, Bound.LOWER, 10, None)
+        entry = tt.probe(1)
+        self.assertEqual(tt.cutoff(entry, 3, 0, 5), 10)
+        self.assertIsNone(tt.cutoff(entry, 3, 0, 20))
+        self.assertIsNone(tt.cutoff(entry, 3, 0, 10))
+        self.assertIsNone(tt.cutoff(entry, 4, 0, 5))
+
+        tt.store(1, 3, Bound.UPPER, 10, None)
+        entry = tt.probe(1)
+        self.assertEqual(tt.cutoff(entry, 2, 15, 20), 10)
+        self.assertIsNone(tt.cutoff(entry, 2, 5, 20))
+        self.assertIsNone(tt.cutoff(entry, 2, 10, 20))
+
+        self.assertEqual(tt.cutoffs, 2)
+
+
+class TestAlphaBetaAgent(unittest.TestCase):
+    def test_same_moves(self):
+        for state, player in list(random_states(2, 0))[::4]:
+            self.assertEqual(
+                AlphaBetaAgent(player, 2).play(state),
+                AlphaBetaAgent(player, 2, tt_size=0).play(state))
+
+    def test_persists(self):
+        agent = AlphaBetaAgent(othello.Player.DARK, 2)
+        referee = othello.Referee(agent,
+                                  AlphaBetaAgent(othello.Player.LIGHT, 1))
+        referee.run()
+
+        self.assertGreater(len(agent.tt), 0)
+        self.assertGreater(agent.tt.hits, 0)
+        self.assertGreater(agent.tt.generation, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
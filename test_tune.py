@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import unittest
+
+import evaluation
+import othello
+import tune
+from mcts_agent import MCTSAgent
+
+
+class TestTune(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_play_pair(self):
+        parameters = tune.TARGETS['linear'].initial
+        # Identical agents from the same opening give the same result with
+        # either colour, hence a score of 0, 1 or 2.
+        self.assertIn(tune.play_pair('linear', parameters, parameters, 0),
+                      (0., 1., 2.))
+
+    def test_checkpoint(self):
+        checkpoint_path = os.path.join(self.directory, 'checkpoint.json')
+
+        tuner = tune.SPSATuner('linear')
+        tuner.run(2, 1, checkpoint_path=checkpoint_path)
+        self.assertEqual(tuner.iteration, 2)
+
+        resumed = tune.SPSATuner('linear')
+        resumed.run(3, 1, checkpoint_path=checkpoint_path)
+        self.assertEqual(resumed.iteration, 3)
+        self.assertEqual(resumed.history[:2], tuner.history)
+
+        uninterrupted = tune.SPSATuner('linear')
+        uninterrupted.run(3, 1)
+        self.assertEqual(uninterrupted.parameters, resumed.parameters)
+
+        with self.assertRaises(ValueError):
+            tune.SPSATuner('mcts').load_checkpoint(checkpoint_path)
+
+    def test_output(self):
+        path = os.path.join(self.directory, 'weights.json')
+        tuner = tune.SPSATuner('linear')
+        parameters = tuner.run(1, 1)
+        tuner.target.save(parameters, path)
+
+        self.assertEqual(evaluation.LinearEvaluation.from_file(path).weights,
+                         parameters)
+
+    def test_mcts_agent(self):
+        path = os.path.join(self.directory, 'mcts.json')
+        tune.TARGETS['mcts'].save((0.5,), path)
+
+        with open(path) as f:
+            self.assertEqual(json.load(f), {'c': 0.5})
+        self.assertEqual(
+            MCTSAgent.from_file(othello.Player.DARK, path, 10).c, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+"""Offline fitting of evaluation weights from recorded positions.
+
+Usage:
+    python3 train.py record DATA_FILE N_GAMES [--seed SEED]
+    python3 train.py linear DATA_FILE [-o WEIGHT_FILE]
+    python3 train.py pattern DATA_FILE [-o WEIGHT_FILE] [--epochs N]
+                                       [--learning-rate RATE]
+
+A data file is a flat array of ``SAMPLE_DTYPE`` records: the dark and light
+boards of a position, as in ``othello.State.to_bytes``, followed by the final
+disc difference (dark minus light) of the game it was taken from. Every record
+is a sample for both players, the target of light being the opposite of that
+of dark.
+
+The data file is memory-mapped and processed in chunks of ``CHUNK_SIZE``
+records, so that it does not need to fit in memory.
+
+``linear`` fits the weights of ``evaluation.heuristic_eval_linear`` by least
+squares, accumulating the normal equations over the chunks, and writes them
+where ``evaluation`` loads them at startup. ``pattern`` fits the weights of
+``pattern_evaluation`` by stochastic gradient descent, and writes them where
+``pattern_evaluation`` loads them at startup. ``record`` generates data from
+random games.
+
+This module requires NumPy.
+"""
+
+import argparse
+import random
+from typing import Iterator
+
+import numpy as np
+
+import batch_evaluation
+import evaluation
+import othello
+import pattern_evaluation
+
+SAMPLE_DTYPE = np.dtype([('dark_board', '<u8'), ('light_board', '<u8'),
+                         ('disc_difference', 'i1')])
+
+CHUNK_SIZE = 1 << 16
+
+
+def record_games(path: str, n_games: int, seed: int = 0) -> int:
+    """Append the positions of random games to a data file.
+
+    Returns the number of records written.
+    """
+    rng = random.Random(seed)
+    n_records = 0
+
+    with open(path, 'ab') as f:
+        for _ in range(n_games):
+            state = othello.State.initial()
+            player = othello.Player.DARK
+            states = []
+
+            while state.get_conclusion() is None:
+                legal_actions = list(state.get_legal_actions(player))
+                if legal_actions != []:
+                    states.append(state)
+                    state = state.perform_action(player,
+                                                 rng.choice(legal_actions))
+                player = player.adversary
+
+            records = np.empty(len(states), dtype=SAMPLE_DTYPE)
+            records['dark_board'] = [s.board.dark_board for s in states]
+            records['light_board'] = [s.board.light_board for s in states]
+            records['disc_difference'] = state.n_number(othello.Player.DARK) \
+                - state.n_number(othello.Player.LIGHT)
+            f.write(records.tobytes())
+            n_records += len(records)
+
+    return n_records
+
+
+def iter_chunks(path: str, chunk_size: int = CHUNK_SIZE) \
+        -> Iterator[np.ndarray]:
+    """Yield the records of a data file in chunks of at most chunk_size."""
+    records = np.memmap(path, dtype=SAMPLE_DTYPE, mode='r')
+
+    for start in range(0, len(records), chunk_size):
+        yield records[start:start + chunk_size]
+
+
+def _samples(chunk: np.ndarray) -> Iterator[tuple[np.ndarray, np.ndarray,
+                                                  othello.Player, np.ndarray]]:
+    """Yield the dark and light boards, player and targets of a chunk."""
+    dark = np.array(chunk['dark_board'])
+    light = np.array(chunk['light_board'])
+    target = chunk['disc_difference'].astype(np.float64)
+
+    yield dark, light, othello.Player.DARK, target
+    yield dark, light, othello.Player.LIGHT, -target
+
+
+def fit_linear(path: str, chunk_size: int = CHUNK_SIZE,
+               regularisation: float = 1e-3) -> np.ndarray:
+    """Fit the weights of the features by least squares.
+
+    Returns the weights, ordered as ``evaluation.FEATURE_NAMES``.
+    """
+    n_features = len(evaluation.FEATURE_NAMES)
+    xtx = np.zeros((n_features, n_features))
+    xty = np.zeros(n_features)
+    n_samples = 0
+
+    for chunk in iter_chunks(path, chunk_size):
+        for dark, light, player, target in _samples(chunk):
+            x = batch_evaluation.features(dark, light, player) \
+                .astype(np.float64)
+            xtx += x.T @ x
+            xty += x.T @ target
+            n_samples += len(target)
+
+    if n_samples == 0:
+        raise ValueError('no samples')
+
+    return np.linalg.solve(xtx + regularisation * n_samples
+                           * np.eye(n_features), xty)
+
+
+def fit_pattern(path: str, n_epochs: int = 4, learning_rate: float = 1e-2,
+                chunk_size: int = CHUNK_SIZE) -> np.ndarray:
+    """Fit the weights of the patterns by stochastic gradient descent.
+
+    Every chunk is a mini-batch. The step of each weight is scaled by the
+    number of instances using it in the chunk, so that rare configurations
+    learn as fast as common ones. Returns the weights.
+    """
+    weights = np.zeros(pattern_evaluation.N_WEIGHTS, dtype=np.float64)
+
+    for _ in range(n_epochs):
+        for chunk in iter_chunks(path, chunk_size):
+            for dark, light, player, target in _samples(chunk):
+                if player is othello.Player.DARK:
+                    indices = pattern_evaluation.pattern_indices_batch(
+                        dark, light)
+                else:  # player is othello.Player.LIGHT
+                    indices = pattern_evaluation.pattern_indices_batch(
+                        light, dark)
+
+                error = target - weights[indices].sum(axis=-1)
+
+                gradient = np.zeros_like(weights)
+                counts = np.zeros_like(weights)
+                np.add.at(gradient, indices,
+                          np.broadcast_to(error[:, np.newaxis], indices.shape))
+                np.add.at(counts, indices, 1.)
+                np.divide(gradient, counts, out=gradient, where=counts > 0)
+
+                weights += learning_rate * gradient
+
+    return weights
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Fit evaluation weights.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser(
+        'record', help='record the positions of random games')
+    record_parser.add_argument('data_file')
+    record_parser.add_argument('n_games', type=int)
+    record_parser.add_argument('--seed', type=int, default=0)
+
+    linear_parser = subparsers.add_parser(
+        'linear', help='fit the weights of evaluation.heuristic_eval_linear')
+    linear_parser.add_argument('data_file')
+    linear_parser.add_argument('-o', '--output',
+                               default=evaluation.DEFAULT_WEIGHTS_PATH)
+
+    pattern_parser = subparsers.add_parser(
+        'pattern', help='fit the weights of pattern_evaluation')
+    pattern_parser.add_argument('data_file')
+    pattern_parser.add_argument(
+        '-o', '--output', default=pattern_evaluation.DEFAULT_WEIGHTS_PATH)
+    pattern_parser.add_argument('--epochs', type=int, default=4)
+    pattern_parser.add_argument('--learning-rate', type=float, default=1e-2)
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        n_records = record_games(args.data_file, args.n_games, args.seed)
+        print(f'{n_records} positions recorded')
+    elif args.command == 'linear':
+        weights = fit_linear(args.data_file)
+        evaluation.save_weights(weights, args.output)
+        for name, w in zip(evaluation.FEATURE_NAMES, weights):
+            print(f'{name}: {w:.4f}')
+    else:  # args.command == 'pattern'
+        weights = fit_pattern(args.data_file, args.epochs, args.learning_rate)
+        pattern_evaluation.save_weights(weights, args.output)
+        print(f'{len(weights)} weights written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Transposition table for game-tree search."""
+
+from dataclasses import dataclass
+from enum import Enum, auto, unique
+from typing import Optional
+
+import othello
+
+
+@unique
+class Bound(Enum):
+    """How the score of an entry relates to the true value of the position."""
+
+    EXACT = auto()  # The score is the value.
+    LOWER = auto()  # The value is at least the score (fail high).
+    UPPER = auto()  # The value is at most the score (fail low).
+
+
+@dataclass(frozen=True)
+class TTEntry:
+    """Result of the search of a position.
+
+    - key:        hash of the position, ``othello.State.hash_key``.
+    - depth:      remaining depth the position was searched to.
+    - bound:      how score relates to the value of the position.
+    - score:      the score found by the search.
+    - move:       the best move found, None if there is none (e.g. a pass).
+    - generation: generation of the table when the entry was stored.
+    """
+
+    __slots__ = ('key', 'depth', 'bound', 'score', 'move', 'generation')
+
+    key: int
+    depth: int
+    bound: Bound
+    score: float
+    move: Optional[othello.Action]
+    generation: int
+
+
+class TranspositionTable:
+    """A fixed-size transposition table.
+
+    Entries live in ``size`` slots indexed by the low bits of the key, and size
+    is rounded down to a power of 2. When a slot is taken by another position,
+    the new entry replaces the old one unless the old one comes from the
+    current search and was searched deeper. Call ``new_search`` before each
+    search so that the entries of earlier searches can be replaced.
+
+    The table counts probes, hits (probes finding the position), cutoffs
+    (hits whose score is returned without searching), stores and overwrites
+    (stores replacing another position).
+    """
+
+    def __init__(self, size: int) -> None:
+        if size < 1:
+            raise ValueError('invalid size')
+
+        self.size = 1 << (size.bit_length() - 1)
+        self._mask = self.size - 1
+        self._slots: list[Optional[TTEntry]] = [None] * self.size
+        self.generation = 0
+        self.reset_stats()
+
+    def new_search(self) -> None:
+        """Start a new search. Entries of earlier searches are kept."""
+        self.generation += 1
+
+    def probe(self, key: int) -> Optional[TTEntry]:
+        """Get the entry of a position, or None if it is not stored."""
+        self.probes += 1
+        entry = self._slots[key & self._mask]
+
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def cutoff(self, entry: TTEntry, depth: int, alpha: float,
+               beta: float) -> Optional[float]:
+        """Get the score to return without searching, if entry gives one.
+
+        The entry must have been searched at least depth deep, and its score
+        must be exact or a bound strictly outside the window [alpha, beta]. A
+        bound equal to alpha or beta is not returned, since a score within the
+        window is taken to be exact, which allows null windows (alpha = beta).
+        """
+        if entry.depth < depth:
+            return None
+
+        if entry.bound is Bound.EXACT \
+                or (entry.bound is Bound.LOWER and entry.score > beta) \
+                or (entry.bound is Bound.UPPER and entry.score < alpha):
+            self.cutoffs += 1
+            return entry.score
+        return None
+
+    def store(self, key: int, depth: int, bound: Bound, score: float,
+              move: Optional[othello.Action]) -> None:
+        """Store the result of the search of a position."""
+        index = key & self._mask
+        old = self._slots[index]
+
+        if old is not None and old.key != key:
+            if old.generation == self.generation and old.depth > depth:
+                return
+            self.overwrites += 1
+
+        self._slots[index] = TTEntry(key, depth, bound, score, move,
+                                     self.generation)
+        self.stores += 1
+
+    def clear(self) -> None:
+        """Remove all entries. The counters are kept."""
+        self._slots = [None] * self.size
+
+    def reset_stats(self) -> None:
+        """Reset the counters."""
+        self.probes = 0
+        self.hits = 0
+        self.cutoffs = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return 0 if self.probes == 0 else self.hits / self.probes
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self._slots)
+
+    def __repr__(self) -> str:
+        return (f'TranspositionTable(size={self.size}, probes={self.probes}, '
+                f'hits={self.hits}, cutoffs={self.cutoffs}, '
+                f'stores={self.stores}, overwrites={self.overwrites})')
@@ -0,0 +1,272 @@
+"""Tuning of agent parameters by match play.
+
+Usage: python3 tune.py [-j JOBS] [--iterations N] [--pairs N]
+                       [--checkpoint FILE] TARGET OUTPUT_FILE
+
+TARGET is one of the keys of ``TARGETS``:
+- linear  the weights of ``evaluation.LinearEvaluation``, played by
+          ``AlphaBetaAgent``. The output is loaded by
+          ``evaluation.LinearEvaluation.from_file``, or by
+          ``evaluation.heuristic_eval_linear`` if written to
+          ``evaluation_weights.json``.
+- mcts    the exploration constant c of ``MCTSAgent``. The output is loaded by
+          ``MCTSAgent.from_file``.
+
+Parameters are tuned by SPSA (simultaneous perturbation stochastic
+approximation). Every iteration perturbs all the parameters at once by a random
+sign vector, in both directions, and plays the two perturbed agents against
+each other. The match result estimates the gradient along the perturbation, and
+the parameters take a step along it. Games are played in pairs, with colours
+swapped, from random openings, spread across worker processes.
+
+The state of the tuner is saved to the checkpoint file after every iteration,
+and tuning resumes from it if it exists.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import random
+from typing import Optional
+
+import evaluation
+import othello
+from alpha_beta_agent import AlphaBetaAgent
+from mcts_agent import MCTSAgent
+
+
+class Target:
+    """Parameters to tune and the agent they drive."""
+
+    # Names of the parameters, their initial values, and their scales, i.e. the
+    # typical size of a meaningful change.
+    names: tuple[str, ...] = ()
+    initial: tuple[float, ...] = ()
+    scales: tuple[float, ...] = ()
+
+    def make_agent(self, play_as: othello.Player,
+                   parameters: tuple[float, ...]) -> othello.Agent:
+        raise NotImplementedError('method not overridden')
+
+    def save(self, parameters: tuple[float, ...], path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(dict(zip(self.names, parameters)), f, indent=4)
+
+
+class LinearTarget(Target):
+    names = evaluation.FEATURE_NAMES
+    initial = tuple(float(w) for w in othello.SCORE_WEIGHTS)
+    scales = (1., 2., 5., 1., 1.)
+
+    def make_agent(self, play_as: othello.Player,
+                   parameters: tuple[float, ...]) -> othello.Agent:
+        return AlphaBetaAgent(play_as, 1,
+                              evaluation.LinearEvaluation(parameters))
+
+    def save(self, parameters: tuple[float, ...], path: str) -> None:
+        evaluation.save_weights(parameters, path)
+
+
+class MCTSTarget(Target):
+    names = ('c',)
+    initial = (2 ** .5,)
+    scales = (.5,)
+
+    # Number of iterations of the agents per move.
+    n_iters = 50
+
+    def make_agent(self, play_as: othello.Player,
+                   parameters: tuple[float, ...]) -> othello.Agent:
+        return MCTSAgent(play_as, self.n_iters, max(parameters[0], 0.))
+
+
+TARGETS: dict[str, Target] = {
+    'linear': LinearTarget(),
+    'mcts': MCTSTarget(),
+}
+
+# Number of random plies played before the agents take over.
+N_OPENING_PLIES = 4
+
+
+def random_opening(rng: random.Random) -> othello.Game:
+    """Play N_OPENING_PLIES random plies from the initial position."""
+    game = othello.Game(othello.State.initial())
+
+    for _ in range(N_OPENING_PLIES):
+        legal_actions = list(game.state.get_legal_actions(game.next_player))
+        game.play(game.next_player,
+                  rng.choice(legal_actions) if legal_actions else None)
+
+    return game
+
+
+def play_pair(target_name: str, first: tuple[float, ...],
+              second: tuple[float, ...], seed: int) -> float:
+    """Play a pair of games between two parameter sets, with colours swapped.
+
+    Both games start from the same random opening. Returns the score of first:
+    1 per win and 0.5 per draw.
+    """
+    target = TARGETS[target_name]
+    opening = random_opening(random.Random(seed))
+    score = 0.
+
+    for first_player in othello.Player:
+        random.seed(seed)
+        agents = {first_player: target.make_agent(first_player, first),
+                  first_player.adversary: target.make_agent(
+                      first_player.adversary, second)}
+        referee = othello.Referee(agents[othello.Player.DARK],
+                                  agents[othello.Player.LIGHT])
+        referee.game = othello.Game(opening.state, opening.next_player)
+        referee.run()
+
+        conclusion = referee.game.get_conclusion()
+        if conclusion is othello.DRAW:
+            score += .5
+        elif conclusion is first_player:
+            score += 1.
+
+    return score
+
+
+def _play_pair_args(args: tuple[str, tuple[float, ...], tuple[float, ...],
+                                int]) -> float:
+    return play_pair(*args)
+
+
+class SPSATuner:
+    """SPSA over the parameters of a target.
+
+    The step sizes are ``a / (k + 1 + A)^alpha`` and the perturbation sizes
+    ``c / (k + 1)^gamma`` at iteration k, both in units of the scales of the
+    parameters.
+    """
+
+    def __init__(self, target_name: str, a: float = .5, c: float = .2,
+                 big_a: float = 10., alpha: float = .602, gamma: float = .101,
+                 seed: int = 0) -> None:
+        self.target_name = target_name
+        self.target = TARGETS[target_name]
+        self.a = a
+        self.c = c
+        self.big_a = big_a
+        self.alpha = alpha
+        self.gamma = gamma
+        self.seed = seed
+
+        self.iteration = 0
+        self.parameters = self.target.initial
+        # (iteration, parameters, score of the positive perturbation).
+        self.history: list[tuple[int, tuple[float, ...], float]] = []
+
+    def step(self, n_pairs: int, executor: Optional[ProcessPoolExecutor]) \
+            -> None:
+        """Run an iteration, playing n_pairs pairs of games."""
+        k = self.iteration
+        rng = random.Random(f'{self.seed}/{k}')
+        a_k = self.a / (k + 1 + self.big_a) ** self.alpha
+        c_k = self.c / (k + 1) ** self.gamma
+
+        delta = tuple(rng.choice((-1, 1)) for _ in self.parameters)
+        plus = tuple(p + c_k * d * s for p, d, s
+                     in zip(self.parameters, delta, self.target.scales))
+        minus = tuple(p - c_k * d * s for p, d, s
+                      in zip(self.parameters, delta, self.target.scales))
+
+        tasks = [(self.target_name, plus, minus, rng.getrandbits(32))
+                 for _ in range(n_pairs)]
+        if executor is None:
+            scores = list(map(_play_pair_args, tasks))
+        else:
+            scores = list(executor.map(_play_pair_args, tasks))
+
+        # Score of plus minus score of minus, per game, in [-1, 1].
+        score = sum(scores) / (2 * n_pairs)
+        result = 2 * score - 1
+
+        self.parameters = tuple(
+            p + a_k * result / (2 * c_k * d) * s
+            for p, d, s in zip(self.parameters, delta, self.target.scales))
+        self.iteration += 1
+        self.history.append((self.iteration, self.parameters, score))
+
+    def save_checkpoint(self, path: str) -> None:
+        """Save the state of the tuner, atomically."""
+        checkpoint = {
+            'target': self.target_name,
+            'iteration': self.iteration,
+            'parameters': list(self.parameters),
+            'history': [[i, list(p), s] for i, p, s in self.history],
+        }
+
+        with open(path + '.tmp', 'w') as f:
+            json.dump(checkpoint, f, indent=4)
+        os.replace(path + '.tmp', path)
+
+    def load_checkpoint(self, path: str) -> None:
+        """Restore the state of the tuner saved by save_checkpoint."""
+        with open(path) as f:
+            checkpoint = json.load(f)
+
+        if checkpoint['target'] != self.target_name:
+            raise ValueError(f'checkpoint of target {checkpoint["target"]}')
+
+        self.iteration = checkpoint['iteration']
+        self.parameters = tuple(checkpoint['parameters'])
+        self.history = [(i, tuple(p), s) for i, p, s in checkpoint['history']]
+
+    def run(self, n_iterations: int, n_pairs: int, jobs: int = 1,
+            checkpoint_path: Optional[str] = None) -> tuple[float, ...]:
+        """Run iterations until n_iterations are done in total.
+
+        Resumes from the checkpoint file if it exists, and saves it after every
+        iteration. Returns the tuned parameters.
+        """
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            self.load_checkpoint(checkpoint_path)
+
+        executor = ProcessPoolExecutor(jobs) if jobs > 1 else None
+        try:
+            while self.iteration < n_iterations:
+                self.step(n_pairs, executor)
+
+                if checkpoint_path is not None:
+                    self.save_checkpoint(checkpoint_path)
+
+                _, parameters, score = self.history[-1]
+                print(f'iteration {self.iteration}: score {score:.3f}, '
+                      + ', '.join(f'{n} = {p:.4f}' for n, p
+                                  in zip(self.target.names, parameters)))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return self.parameters
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Tune agent parameters by match play.')
+    parser.add_argument('target', choices=TARGETS)
+    parser.add_argument('output_file')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='number of worker processes')
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--pairs', type=int, default=8,
+                        help='pairs of games per iteration')
+    parser.add_argument('--checkpoint',
+                        help='file to save progress to and resume from')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    tuner = SPSATuner(args.target, seed=args.seed)
+    parameters = tuner.run(args.iterations, args.pairs, args.jobs,
+                           args.checkpoint)
+    tuner.target.save(parameters, args.output_file)
+
+
+if __name__ == '__main__':
+    main()